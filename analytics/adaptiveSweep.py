@@ -0,0 +1,185 @@
+# Adaptive Sweep
+# Runs headless simulations in rounds and only adds replicates to the (strategy, droneCount, angle) cells whose confidence interval is still wider than a target
+
+import os
+import json
+import math
+import shutil
+import argparse
+import numpy as np
+import analytics
+import generateData
+
+# Cells: every strategy at every drone count and angle, logged under one experiment folder
+SWEEP_STRATEGIES = ['Centralized', 'Decentralized']
+SWEEP_EXPERIMENT = 'AngleFixed'
+SWEEP_DRONE_COUNTS = list(generateData.DRONE_COUNTS)
+SWEEP_ANGLES = [60.0]
+SWEEP_METRIC = 'makespan'  # Per-simulation value whose interval must converge (a key of analytics.STAT_METRICS)
+
+# Stopping rule: a cell is done once the margin of error of its mean (at CONFIDENCE_LEVEL) is within the target
+TARGET_RELATIVE_MARGIN = 0.05  # Target margin of error as a fraction of the cell mean
+TARGET_MARGIN = None           # Target margin of error in the metric's units; replaces the relative target when set
+MIN_REPLICATES = 3             # Runs of a cell before its interval is trusted
+MAX_REPLICATES = 30            # Runs of a cell after which it is not scheduled again, converged or not
+MAX_BATCH_REPLICATES = 5       # Most runs added to one cell in one round
+MAX_ROUNDS = 10                # Most rounds of runs
+RUN_BUDGET = None              # Most runs over all rounds (None = no limit); cells furthest from their target go first
+
+# --- Cells ---
+
+def cellKey(strategy, droneCount, angle):
+    """Return the key of a cell, so angles read from files (e.g., 60 or 60.0) match the configured ones."""
+    return (strategy, int(droneCount), round(float(angle), 6))
+
+def measureCells(rootFolder, strategies, experiment, metric, jobs=None):
+    """Return {cell: [value per simulation]} for every data file of the experiment under rootFolder.
+    Values come from the analytics results store, so each round only reads the files added since the last one.
+    """
+    dataDir, _, fileFunc = analytics.STAT_METRICS[metric]
+    cells = {}
+    for strategy in strategies:
+        folderPath = analytics.dataFolder(rootFolder, dataDir, strategy, experiment)
+        if not os.path.isdir(folderPath):
+            continue
+        analytics.updateManifest(rootFolder, [folderPath])  # Pick up the runs added since the last round
+        for (droneCount, angle), values in analytics.cellStats(folderPath, fileFunc, jobs).items():
+            cells.setdefault(cellKey(strategy, droneCount, angle), []).extend(values)
+    return cells
+
+def assessCell(values, confidence=analytics.CONFIDENCE_LEVEL, targetMargin=TARGET_MARGIN, relativeMargin=TARGET_RELATIVE_MARGIN,
+               minReplicates=MIN_REPLICATES, maxReplicates=MAX_REPLICATES):
+    """Return {'runs', 'mean', 'margin', 'target', 'needed', 'status'} for the values of one cell.
+    needed estimates the total runs to reach the target: the margin of error shrinks as 1 / sqrt(runs).
+    """
+    runs = len(values)
+    mean = float(np.mean(values)) if runs else float('nan')
+    margin = float(analytics.marginOfError(values, confidence)) if runs > 1 else float('inf')
+    target = targetMargin if targetMargin is not None else relativeMargin * abs(mean) if runs else float('nan')
+    if runs < minReplicates:
+        needed, status = minReplicates, 'warming up'
+    elif margin <= target:
+        needed, status = runs, 'converged'
+    else:
+        needed = math.ceil(runs * (margin / target) ** 2) if target > 0 else maxReplicates
+        status = 'open'
+    if needed > runs and runs >= maxReplicates:
+        needed, status = runs, 'at limit'
+    return {'runs': runs, 'mean': mean, 'margin': margin, 'target': target, 'needed': min(needed, maxReplicates), 'status': status}
+
+def priority(assessment):
+    """Return how far a cell is from its target (cells still warming up first)."""
+    if assessment['status'] == 'warming up':
+        return float('inf')
+    return assessment['margin'] / assessment['target'] if assessment['target'] > 0 else float('inf')
+
+def planRound(assessments, maxBatch=MAX_BATCH_REPLICATES, budget=None):
+    """Return {cell: extra runs} for the next round, at most maxBatch per cell and budget in total.
+    When the budget is short, the cells furthest from their target are served first.
+    """
+    plan = {}
+    for cell in sorted(assessments, key=lambda cell: -priority(assessments[cell])):
+        extra = min(assessments[cell]['needed'] - assessments[cell]['runs'], maxBatch)
+        if budget is not None:
+            extra = min(extra, budget - sum(plan.values()))
+        if extra > 0:
+            plan[cell] = extra
+    return plan
+
+def makeJobs(plan, experiment, firstSimId):
+    """Return one generateData job per planned run, with consecutive sim_ids from firstSimId."""
+    jobs, simId = [], firstSimId
+    for (strategy, droneCount, angle), extra in sorted(plan.items()):
+        for _ in range(extra):
+            jobs.append(generateData.make_job(droneCount, simId, strategy=strategy, experiment_type=experiment, max_angle=angle))
+            simId += 1
+    return jobs
+
+def printCells(assessments, plan=None):
+    """Print one line per cell: runs, mean, margin of error against the target, status and the runs planned next."""
+    print(f"  {'strategy':<14} {'drones':>6} {'angle':>6} {'runs':>5} {'mean':>11} {'margin':>10} {'target':>10}  status")
+    for cell in sorted(assessments):
+        strategy, droneCount, angle = cell
+        a = assessments[cell]
+        planned = f" (+{plan[cell]})" if plan and cell in plan else ''
+        print(f"  {strategy:<14} {droneCount:>6} {angle:>6g} {a['runs']:>5} {a['mean']:>11.3f} {a['margin']:>10.3f} {a['target']:>10.3f}  {a['status']}{planned}")
+
+# --- Sweep ---
+
+def runSweep(args):
+    """Alternate rounds of simulations with an assessment of every cell until all cells converge or a limit is hit.
+    Returns the final assessments.
+    """
+    grid = [cellKey(strategy, droneCount, angle) for strategy in args.strategy for droneCount in args.counts for angle in args.angles]
+    spent, plan, previous = 0, {}, {}
+    for roundNumber in range(1, args.rounds + 2):
+        measured = measureCells(generateData.OUTPUT_ROOT, args.strategy, args.experiment, args.metric)
+        assessments = {cell: assessCell(measured.get(cell, []), args.confidence, args.target, args.relative_target,
+                                        args.min_replicates, args.max_replicates) for cell in grid}
+        # A cell that gains no files (every run failed, or the runs were logged under another cell) would be planned forever
+        stalled = [cell for cell in plan if assessments[cell]['runs'] <= previous[cell]['runs']]
+        budget = None if args.budget is None else args.budget - spent
+        plan = planRound(assessments, args.batch, budget) if roundNumber <= args.rounds and not stalled else {}
+        print(f"\n=== Round {roundNumber}: {args.metric}, {len(grid)} cells, {spent} runs so far ===")
+        printCells(assessments, plan)
+        if stalled:
+            print(f"No new data for {len(stalled)} cells, e.g., {stalled[0]}. Check that the runs succeeded and that the "
+                  f"simulation reads --strategy, --experiment-type, --max-angle and --drone-count.")
+        if not plan or args.plan:
+            break
+        jobs = makeJobs(plan, args.experiment, generateData.next_sim_id())
+        print(f"Running {len(jobs)} simulations for {len(plan)} cells, {args.jobs} at a time...")
+        succeeded = generateData.run_batch(jobs, args.jobs, args.timeout, args.retries)
+        for job in succeeded:
+            shutil.rmtree(generateData.run_dir_for(job), ignore_errors=True)
+        spent += len(jobs)
+        previous = assessments
+    counts = {}
+    for assessment in assessments.values():
+        counts[assessment['status']] = counts.get(assessment['status'], 0) + 1
+    print(f"\nAfter {spent} runs: " + ', '.join(f"{count} {status}" for status, count in sorted(counts.items())))
+    return assessments
+
+def writeReport(path, args, assessments):
+    """Write the final assessment of every cell to path as JSON."""
+    cells = [{'strategy': strategy, 'droneCount': droneCount, 'angle': angle, **assessment}
+             for (strategy, droneCount, angle), assessment in sorted(assessments.items())]
+    with open(path, 'w') as file:
+        json.dump({'root': generateData.OUTPUT_ROOT, 'experiment': args.experiment, 'metric': args.metric,
+                   'confidence': args.confidence, 'cells': cells}, file, indent=2)
+
+# --- Command Line ---
+
+def main():
+    parser = argparse.ArgumentParser(description='Run simulations in rounds until every cell\'s confidence interval is narrow enough.')
+    parser.add_argument('--root', default=generateData.OUTPUT_ROOT, help='merged data tree to read and add runs to (default: %(default)s)')
+    parser.add_argument('--strategy', nargs='+', default=SWEEP_STRATEGIES, help='strategies to sweep (default: %(default)s)')
+    parser.add_argument('--experiment', default=SWEEP_EXPERIMENT, help='experiment folder the runs are logged under (default: %(default)s)')
+    parser.add_argument('--counts', nargs='+', type=int, default=SWEEP_DRONE_COUNTS, help='drone counts to sweep')
+    parser.add_argument('--angles', nargs='+', type=float, default=SWEEP_ANGLES, help='maximum angles to sweep (default: %(default)s)')
+    parser.add_argument('--metric', choices=list(analytics.STAT_METRICS), default=SWEEP_METRIC,
+                        help='per-simulation value whose interval must converge (default: %(default)s)')
+    parser.add_argument('--confidence', type=float, default=analytics.CONFIDENCE_LEVEL, help='confidence level (default: %(default)s)')
+    parser.add_argument('--target', type=float, default=TARGET_MARGIN, help='target margin of error in the metric\'s units')
+    parser.add_argument('--relative-target', type=float, default=TARGET_RELATIVE_MARGIN,
+                        help='target margin of error as a fraction of the cell mean, unless --target is set (default: %(default)s)')
+    parser.add_argument('--min-replicates', type=int, default=MIN_REPLICATES, help='runs per cell before it can converge (default: %(default)s)')
+    parser.add_argument('--max-replicates', type=int, default=MAX_REPLICATES, help='most runs per cell (default: %(default)s)')
+    parser.add_argument('--batch', type=int, default=MAX_BATCH_REPLICATES, help='most runs added to a cell per round (default: %(default)s)')
+    parser.add_argument('--rounds', type=int, default=MAX_ROUNDS, help='most rounds (default: %(default)s)')
+    parser.add_argument('--budget', type=int, default=RUN_BUDGET, help='most runs in total (default: no limit)')
+    parser.add_argument('--plan', action='store_true', help='only print the cells and the runs the next round would add')
+    parser.add_argument('--report', metavar='FILE', help='write the final state of every cell to FILE as JSON')
+    parser.add_argument('--jobs', '-j', type=int, default=generateData.PARALLEL_RUNS, help='simulations to run at once (default: %(default)s)')
+    parser.add_argument('--timeout', type=int, default=generateData.RUN_TIMEOUT_SEC, help='seconds before a run is killed (default: %(default)s)')
+    parser.add_argument('--retries', type=int, default=generateData.MAX_RETRIES, help='extra attempts per failed run (default: %(default)s)')
+    args = parser.parse_args()
+    args.jobs = max(1, args.jobs)
+    generateData.OUTPUT_ROOT = args.root
+    assessments = runSweep(args)
+    if args.report:
+        writeReport(args.report, args, assessments)
+        print(f"Report written to {args.report}")
+
+if __name__ == "__main__":
+    main()
@@ -2,20 +2,36 @@
 # Processes data files to compute and visualize makespan and traversal statistics for drone navigation strategies
 
 import os
+import re
+import sys
+import time
+import json
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from collections import OrderedDict
+from functools import lru_cache, partial
+from itertools import chain
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.spatial.distance import cdist
-from scipy.optimize import linear_sum_assignment
-import scipy.stats
+import emdEngine
+import bootstrap
+import instrumentation
+import manifest
+import resultsStore
+import spatialBinary
+from onlineStats import OnlineStats
+# matplotlib, scipy.stats/special and trajectoryMetrics (scipy.spatial) are imported where they are used,
+# so stats-only runs start quickly and never load the plotting stack
 
 # === USER-CONFIGURABLE CONSTANTS ===
 
-# Directory paths
-ROOT_FOLDER = 'F:/files/school/wwu/research/robotics/simulationSwarm/cluttered-navigation/plinko-drones/analytics/sampleOutput/root'
-MAKESPAN_DIR = 'makespan'
-SPATIAL_DIR = 'spatial'
-STRATEGIES = ['centralized', 'decentralized']
-FOLDER_TYPES = ['bothFixed', 'angleFixed', 'countFixed']
+# Directory paths (folder names match case-insensitively, so sampleOutput/'s lowercase tree works too). Overridden by --root.
+ROOT_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output-data', 'root')
+MAKESPAN_DIR = 'Makespan'
+SPATIAL_DIR = 'Spatial'
+STRATEGIES = ['Centralized', 'Decentralized']
+FOLDER_TYPES = ['BothFixed', 'AngleFixed', 'CountFixed']
+X_AXIS = {'bothfixed': 'droneCount', 'anglefixed': 'droneCount', 'countfixed': 'angle'}  # x value per experiment type (lowercase)
 
 # Plotting options
 PLOT_COLORS = [
@@ -32,9 +48,61 @@ FONT_SIZE = 12
 BEST_FIT_DEGREE = 1
 BEST_FIT_LABEL = {1: 'Linear Best Fit', 2: 'Quadratic Best Fit', 3: 'Cubic Best Fit'}
 
+# Parsing options
+NULL_VALUE = '<null>'  # Placeholder the logger writes for missing values (e.g., a drone that never exited)
+MAKESPAN_MEMORY_CACHE_SIZE = 256  # Parsed makespan files kept in memory so each file is only read once per run
+
+# Parse cache: parsed columns are stored as .npy files and only reparsed when a data file's size or mtime changes
+USE_PARSE_CACHE = True
+PARSE_CACHE_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.parseCache')
+PARSE_CACHE_VERSION = 1  # Bump when the parsers change so stale entries are rebuilt
+EMD_MEMORY_CACHE_SIZE = 128  # Per-file EMD series kept in memory (series are also stored in the parse cache folder)
+
+# Binary spatial logs: read Simulation-N.bin (written by spatialBinary.py) instead of the text log when it is up to date
+USE_SPATIAL_BINARY = True
+
+# Manifest: SQLite index of every data file (strategy, experiment, count, angle, time range, frame offsets)
+USE_MANIFEST = True
+MANIFEST_PATH = manifest.DEFAULT_PATH  # analytics/.manifest.sqlite, also the default of 'python manifest.py'
+
+# File selection (also --count, --angle and --time): inclusive (min, max) ranges, either end None; None = everything
+DRONE_COUNT_RANGE = None  # Only analyze files with a drone count in this range
+ANGLE_RANGE = None        # Only analyze files with a maximum angle in this range
+TIME_RANGE = None         # Spatial metrics (EMD, trajectories) only use the frames whose time stamp (ms) is in this range
+
+# Results store: per-file and per-folder results kept between runs, so only new or changed files are recomputed
+USE_RESULTS_STORE = True
+RESULTS_STORE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.results.sqlite')
+RESULTS_VERSION = 2  # Bump when an extractor changes so stored results are recomputed
+
+# EMD solver: 'exact' (optimal assignment), 'sliced' (sliced Wasserstein) or 'sinkhorn' (entropic, batched per file)
+EMD_MODE = 'exact'
+SLICED_PROJECTIONS = 50      # Projection directions for the sliced solver (more = more accurate)
+SINKHORN_EPSILON = 0.01      # Entropic regularization, relative to the mean cost of a frame (smaller = more accurate)
+SINKHORN_ITERATIONS = 200    # Sinkhorn iterations per batch
+SINKHORN_BATCH_FRAMES = 64   # Most frames solved together per Sinkhorn batch
+SINKHORN_MAX_BYTES = 256 * 2 ** 20  # Memory budget of one Sinkhorn batch; fewer frames are batched when frames are large
+# Exact mode for frames with a different number of drones than the reference: 'matching' leaves the extra drones out
+# (fast, the original definition); 'transport' splits every drone's mass like the sliced and Sinkhorn modes (much slower)
+EXACT_UNEQUAL_SIZES = 'matching'
+
+# Trajectory metrics: drone pairs closer than this (field units, center to center) count as a near miss.
+# Drones have a collision radius of 8 units, so 24 is 1.5 drone diameters.
+NEAR_MISS_DISTANCE = 24.0
+TRAJECTORY_MEMORY_CACHE_SIZE = 128  # Per-file trajectory metrics kept in memory
+TRAJECTORY_VERSION = 1  # Bump when trajectoryMetrics.py changes so cached metrics and stored results are recomputed
+
 # Margin of error/confidence interval
 CONFIDENCE_LEVEL = 0.95
 
+# Bootstrap: percentile intervals from resampled simulations, all groups and figures resampled together (see bootstrap.py)
+BOOTSTRAP_RESAMPLES = 2000
+BOOTSTRAP_SEED = 0
+SHOW_CONFIDENCE_BAND = True  # Shade the bootstrap confidence band of the best-fit line in scatter plots
+
+# Online statistics: quantile sketch size for strategy summaries (larger = more accurate percentiles, more memory)
+QUANTILE_SKETCH_K = 400
+
 # Title templates for all graphs (customize as needed)
 TITLE_BARCHART_MAKESPAN_STRATEGY = 'Makespan by Strategy (Angle & Count Fixed)'
 TITLE_BARCHART_TRAVERSAL_STRATEGY = 'Average Traversal Time by Strategy (Angle & Count Fixed)'
@@ -51,340 +119,1323 @@ TITLE_EMD_ANGLE_CENTRALIZED = 'EMD vs. Angle for Centralized Strategy'
 TITLE_MAKESPAN_ANGLE_DECENTRALIZED = 'Makespan vs. Angle for Decentralized Strategy'
 TITLE_TRAVERSAL_ANGLE_DECENTRALIZED = 'Average Traversal Time vs. Angle for Decentralized Strategy'
 TITLE_EMD_ANGLE_DECENTRALIZED = 'EMD vs. Angle for Decentralized Strategy'
+# Trajectory metric titles ({} is replaced by the strategy)
+TITLE_PATHLENGTH_DRONECOUNT = 'Average Path Length vs. Drone Count for {} Strategy'
+TITLE_SPEED_DRONECOUNT = 'Average Drone Speed vs. Drone Count for {} Strategy'
+TITLE_SEPARATION_DRONECOUNT = 'Minimum Separation vs. Drone Count for {} Strategy'
+TITLE_NEARMISS_DRONECOUNT = 'Near Misses vs. Drone Count for {} Strategy'
+TITLE_PATHLENGTH_ANGLE = 'Average Path Length vs. Angle for {} Strategy'
+TITLE_SPEED_ANGLE = 'Average Drone Speed vs. Angle for {} Strategy'
+TITLE_SEPARATION_ANGLE = 'Minimum Separation vs. Angle for {} Strategy'
+TITLE_NEARMISS_ANGLE = 'Near Misses vs. Angle for {} Strategy'
 
 # Other settings
 SHOW_MEANS = True
 SHOW_LEGEND = True
 
+# Batch rendering: when set, figures are written to this folder (rendered in parallel, headless) instead of shown.
+# A figure is only redrawn when its data or plot settings changed since the last render. Overridden by --render.
+RENDER_FOLDER = None
+FIGURE_FORMAT = 'png'  # 'png', 'svg' or 'pdf'
+FIGURE_DPI = 150
+
+# Parallel processing: number of worker processes for per-file work (1 = serial). Overridden by --jobs.
+JOBS = 1
+SHOW_PROGRESS = True  # Print per-folder progress to stderr while a worker pool is running
+
+# --- Parsing and Cache Functions ---
+
+def _toFloatColumn(column):
+    """Convert a column of strings to float64, using NaN for '<null>' and malformed entries."""
+    column = np.char.strip(column)
+    try:
+        return column.astype(np.float64)
+    except ValueError:
+        values = np.full(column.shape, np.nan)
+        for i, val in enumerate(column):
+            try:
+                values[i] = float(val)
+            except ValueError:
+                continue
+        return values
+
+def _toIntColumn(column):
+    """Convert a column of strings to int64, using -1 for '<null>' and malformed entries."""
+    values = _toFloatColumn(column)
+    valid = np.isfinite(values)
+    ints = np.full(values.shape, -1, dtype=np.int64)
+    ints[valid] = values[valid].astype(np.int64)
+    return ints
+
+def _readRows(filePath, width):
+    """Read a headerless CSV log into a (rows, width) string array, plus the raw first line values."""
+    with instrumentation.timed('parse.read'):
+        with open(filePath) as file:
+            rows = [line.strip().split(',') for line in file]
+    with instrumentation.timed('parse.split'):
+        firstLine = rows[0] if rows else []
+        table = np.array([vals[:width] for vals in rows if len(vals) >= width], dtype=str).reshape(-1, width)
+    instrumentation.count('parse.filesRead')
+    instrumentation.count('parse.rows', len(table))
+    instrumentation.count('parse.shortRowsSkipped', len(rows) - len(table))
+    return table, firstLine
+
+def _parseMakespanText(filePath):
+    """Parse makespan text into columns (see loadMakespanFile)."""
+    table, firstLine = _readRows(filePath, 6)
+    columns = {
+        'strategy': table[:, 0],
+        'droneCount': _toIntColumn(table[:, 1]),
+        'maxAngle': _toFloatColumn(table[:, 2]),
+        'droneID': table[:, 3],
+        'entryTime': _toFloatColumn(table[:, 4]),
+        'exitTime': _toFloatColumn(table[:, 5]),
+        'exitNull': np.char.strip(table[:, 5]) == NULL_VALUE
+    }
+    instrumentation.count('parse.nullExitRows', int(columns['exitNull'].sum()))
+    return columns, firstLine
+
+def _parseSpatialText(filePath):
+    """Parse spatial text into columns (see loadSpatialFile). Rows with missing or malformed positions are dropped."""
+    table, firstLine = _readRows(filePath, 7)
+    timeStamp, x, y = _toFloatColumn(table[:, 4]), _toFloatColumn(table[:, 5]), _toFloatColumn(table[:, 6])
+    valid = np.isfinite(x) & np.isfinite(y) & np.isfinite(timeStamp) & (timeStamp == np.floor(timeStamp))
+    columns = {
+        'droneID': table[valid, 3],
+        'timeStamp': timeStamp[valid].astype(np.int64),
+        'x': x[valid],
+        'y': y[valid]
+    }
+    instrumentation.count('parse.invalidPositionRows', int(len(valid) - valid.sum()))
+    return columns, firstLine
+
+def _fileFingerprint(filePath):
+    """Return (absolute path, size, mtime) used to tell whether a data file has changed."""
+    info = os.stat(filePath)
+    return os.path.abspath(filePath), info.st_size, info.st_mtime_ns
+
+def _cacheEntryFolder(absPath):
+    """Return the cache folder holding the parsed columns of a data file."""
+    return os.path.join(PARSE_CACHE_FOLDER, hashlib.sha1(absPath.encode('utf-8')).hexdigest())
+
+def _readCacheMeta(absPath, size, mtime):
+    """Return the cache metadata for a data file, or None if there is no up-to-date entry."""
+    try:
+        with open(os.path.join(_cacheEntryFolder(absPath), 'meta.json')) as file:
+            meta = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if meta.get('version') != PARSE_CACHE_VERSION or meta.get('path') != absPath \
+            or meta.get('size') != size or meta.get('mtime') != mtime:
+        return None
+    return meta
+
+def _loadCacheColumns(absPath, meta):
+    """Memory-map the cached columns of a data file (read-only)."""
+    folder = _cacheEntryFolder(absPath)
+    columns = {}
+    for name in meta['columns']:
+        column = np.load(os.path.join(folder, name + '.npy'), mmap_mode='r')
+        columns[name] = column
+    return columns
+
+def _writeCacheEntry(absPath, size, mtime, kind, columns, firstLine):
+    """Store parsed columns for a data file. The metadata file is written last so partial entries are never used."""
+    folder = _cacheEntryFolder(absPath)
+    metaPath = os.path.join(folder, 'meta.json')
+    try:
+        os.makedirs(folder, exist_ok=True)
+        try:
+            with open(metaPath) as file:
+                previous = json.load(file)
+        except (OSError, ValueError):
+            previous = None
+        if os.path.exists(metaPath):
+            os.remove(metaPath)
+        # EMD series and trajectory metrics are keyed on the file fingerprint, so they stay valid while it is unchanged.
+        # Once it changes they can never be read again and are removed.
+        if previous is not None and (previous.get('size'), previous.get('mtime')) != (size, mtime):
+            for fileName in os.listdir(folder):
+                if fileName.startswith(('emd-', 'trajectory-')):
+                    os.remove(os.path.join(folder, fileName))
+        for name, column in columns.items():
+            np.save(os.path.join(folder, name + '.npy'), column)
+        meta = {
+            'version': PARSE_CACHE_VERSION, 'path': absPath, 'size': size, 'mtime': mtime,
+            'kind': kind, 'columns': list(columns), 'firstLine': firstLine
+        }
+        tmpPath = metaPath + f'.{os.getpid()}.tmp'
+        with open(tmpPath, 'w') as file:
+            json.dump(meta, file)
+        os.replace(tmpPath, metaPath)
+    except OSError as error:
+        print(f"Warning: could not write parse cache for '{absPath}': {error}")
+
+def _countCacheHit(columns):
+    """Count a file served from the parse cache, and its rows, separately from the files and rows parsed."""
+    instrumentation.count('parseCache.hits')
+    instrumentation.count('parseCache.rows', len(next(iter(columns.values()), ())))
+
+def cachedColumns(filePath, kind, parser):
+    """Return the parsed columns of a data file, reparsing it with parser only if it changed since it was cached."""
+    absPath, size, mtime = _fileFingerprint(filePath)
+    if USE_PARSE_CACHE:
+        meta = _readCacheMeta(absPath, size, mtime)
+        if meta is not None and meta.get('kind') == kind:
+            try:
+                columns = _loadCacheColumns(absPath, meta)
+                _countCacheHit(columns)
+                return columns
+            except (OSError, ValueError):
+                pass
+    instrumentation.count('parseCache.misses')
+    with instrumentation.timed('parse.' + kind):
+        columns, firstLine = parser(absPath)
+    if USE_PARSE_CACHE:
+        _writeCacheEntry(absPath, size, mtime, kind, columns, firstLine)
+    return columns
+
+def _freezeColumns(columns):
+    """Mark in-memory columns read-only, since they are shared between callers."""
+    for column in columns.values():
+        if column.flags.writeable:
+            column.flags.writeable = False
+    return columns
+
+@lru_cache(maxsize=MAKESPAN_MEMORY_CACHE_SIZE)
+def _loadMakespanColumns(absPath, size, mtime):
+    """Load makespan columns. Memoized on the file fingerprint, see loadMakespanFile()."""
+    return _freezeColumns(cachedColumns(absPath, 'makespan', _parseMakespanText))
+
+def loadMakespanFile(filePath):
+    """Read a makespan file once into a dict of typed NumPy columns.
+    Columns: strategy, droneCount, maxAngle, droneID, entryTime, exitTime (NaN where missing)
+    and exitNull (True where the exit time was logged as '<null>').
+    """
+    return _loadMakespanColumns(*_fileFingerprint(filePath))
+
+def currentSpatialBinary(filePath):
+    """Return the memory-mapped binary copy of a spatial log if enabled and up to date, otherwise None."""
+    return spatialBinary.currentBinary(filePath) if USE_SPATIAL_BINARY else None
+
+def loadSpatialFile(filePath):
+    """Read a spatial file into a dict of NumPy columns: droneID, timeStamp, x, y (valid positions only).
+    Positions come straight from the mapped binary copy (float32) when there is one.
+    """
+    data = currentSpatialBinary(filePath)
+    if data is not None:
+        instrumentation.count('spatialBinary.filesRead')
+        return _freezeColumns(spatialBinary.columns(data))
+    return _freezeColumns(cachedColumns(filePath, 'spatial', _parseSpatialText))
+
 # --- Utility Functions ---
 
 def readFirstLineValue(filePath, xAxis):
     """Extract x value (droneCount or angle) from the first line of a file."""
     try:
-        with open(filePath) as file:
-            vals = file.readline().strip().split(',')
-            if len(vals) < 3:
-                return None
-            return int(vals[1]) if xAxis == 'droneCount' else float(vals[2])
+        row = openManifest().lookup(filePath) if USE_MANIFEST else None
+        if row is not None and row['droneCount'] is not None:
+            return row['droneCount'] if xAxis == 'droneCount' else row['angle']
+        vals = None
+        if USE_PARSE_CACHE:
+            meta = _readCacheMeta(*_fileFingerprint(filePath))
+            if meta is not None:
+                vals = meta['firstLine']
+        if vals is None:
+            with open(filePath) as file:
+                vals = file.readline().strip().split(',')
+        if len(vals) < 3:
+            return None
+        return int(vals[1]) if xAxis == 'droneCount' else float(vals[2])
     except Exception:
         return None
     
+def dataFolder(rootFolder, *names):
+    """Join folder names onto rootFolder, matching each name case-insensitively (e.g., 'Makespan' or 'makespan')."""
+    path = rootFolder
+    for name in names:
+        candidate = os.path.join(path, name)
+        if not os.path.isdir(candidate) and os.path.isdir(path):
+            matches = [entry for entry in sorted(os.listdir(path)) if entry.lower() == name.lower()]
+            candidate = os.path.join(path, matches[0]) if matches else candidate
+        path = candidate
+    return path
+
+def _inRange(value, valueRange):
+    """Return whether value lies in an inclusive (min, max) range, where either end (or the range) can be None."""
+    if valueRange is None:
+        return True
+    low, high = valueRange
+    return value is not None and (low is None or value >= low) and (high is None or value <= high)
+
+def listDataFiles(folderPath):
+    """Return the paths of the .txt data files in a folder whose drone count and angle are in DRONE_COUNT_RANGE
+    and ANGLE_RANGE. With USE_MANIFEST, the files are selected by a manifest query (ordered by path), and the
+    folder is only rescanned the first time it is listed in a command; otherwise they are listed and filtered here.
+    """
+    folder = os.path.abspath(folderPath)
+    root = os.path.dirname(os.path.dirname(os.path.dirname(folder)))
+    if USE_MANIFEST and os.path.isdir(folder) and manifest.describePath(root, os.path.join(folder, 'Simulation-0.txt')):
+        if not any(folder == fresh or folder.startswith(fresh + os.sep) for fresh in _freshFolders):
+            updateManifest(root, [folder])
+        return [row['path'] for row in openManifest().query(droneCount=DRONE_COUNT_RANGE, angle=ANGLE_RANGE, rootFolder=folder)]
+    filePaths = [os.path.join(folderPath, fileName) for fileName in os.listdir(folderPath) if fileName.endswith('.txt')]
+    if DRONE_COUNT_RANGE is None and ANGLE_RANGE is None:
+        return filePaths
+    return [filePath for filePath in filePaths if _inRange(readFirstLineValue(filePath, 'droneCount'), DRONE_COUNT_RANGE)
+            and _inRange(readFirstLineValue(filePath, 'angle'), ANGLE_RANGE)]
+
+_manifest = (None, None)  # (process id, Manifest); SQLite connections must not be shared with forked workers
+
+def openManifest():
+    """Return this process's connection to the manifest at MANIFEST_PATH."""
+    global _manifest
+    if _manifest[0] != os.getpid() or _manifest[1].dbPath != MANIFEST_PATH:
+        _manifest = (os.getpid(), manifest.Manifest(MANIFEST_PATH))
+    return _manifest[1]
+
+_freshFolders = set()  # Folders rescanned by updateManifest() since the command started (see listDataFiles())
+
+def updateManifest(rootFolder=None, folders=None):
+    """Bring the manifest up to date with rootFolder (default ROOT_FOLDER), or only with the given data folders
+    under it, rescanning only new or changed files. listDataFiles() calls it for each folder it is first asked for.
+    """
+    rootFolder = ROOT_FOLDER if rootFolder is None else rootFolder
+    if not USE_MANIFEST or not os.path.isdir(rootFolder):
+        return
+    with instrumentation.timed('manifest.update'):
+        indexed, removed = openManifest().update(rootFolder, folders)
+    instrumentation.count('manifest.filesIndexed', indexed)
+    instrumentation.count('manifest.filesRemoved', removed)
+    _freshFolders.update(os.path.abspath(folder) for folder in (folders if folders is not None else [rootFolder]))
+
+def selectFiles(kind, strategy=None, experiment=None, droneCount=None, angle=None, rootFolder=None):
+    """Return the paths of the data files under rootFolder (default ROOT_FOLDER) matching the given filters.
+    kind is 'makespan' or 'spatial'; droneCount and angle take a value or an inclusive (min, max) range.
+    The manifest is brought up to date first, which only rescans new or changed files.
+    """
+    rootFolder = ROOT_FOLDER if rootFolder is None else rootFolder
+    updateManifest(rootFolder)
+    return [row['path'] for row in openManifest().query(kind, strategy, experiment, droneCount, angle, rootFolder)]
+
+# Settings that can change at runtime (e.g., from the command line) and must be copied into worker processes
+WORKER_SETTINGS = ['EMD_MODE', 'NEAR_MISS_DISTANCE', 'USE_PARSE_CACHE', 'PARSE_CACHE_FOLDER', 'USE_SPATIAL_BINARY', 'USE_MANIFEST', 'MANIFEST_PATH',
+                   'TIME_RANGE']
+
+def _initWorker(settings):
+    """Apply the parent process's runtime settings in a worker process."""
+    globals().update(settings)
+
+def _instrumentedCall(func, filePath):
+    """Run func in a worker with instrumentation on and return (result, the worker's timers and counters)."""
+    instrumentation.enable()
+    instrumentation.reset()
+    result = func(filePath)
+    return result, instrumentation.snapshot()
+
+def mapFiles(func, filePaths, label='', jobs=None):
+    """Apply func to every file and return the results in the same order as filePaths.
+    With more than one job, files are spread over a process pool and progress is shown as they complete.
+    """
+    jobs = JOBS if jobs is None else jobs
+    if jobs <= 1 or len(filePaths) < 2:
+        return [func(filePath) for filePath in filePaths]
+    # Worker timers and counters are sent back with each result and merged here
+    instrumented = instrumentation.ENABLED
+    if instrumented:
+        func = partial(_instrumentedCall, func)
+    results = [None] * len(filePaths)
+    settings = {name: globals()[name] for name in WORKER_SETTINGS}
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_initWorker, initargs=(settings,)) as executor:
+        futures = {executor.submit(func, filePath): i for i, filePath in enumerate(filePaths)}
+        for done, future in enumerate(as_completed(futures), 1):
+            results[futures[future]] = future.result()
+            if instrumented:
+                results[futures[future]], workerStats = results[futures[future]]
+                instrumentation.merge(workerStats)
+            if SHOW_PROGRESS:
+                print(f"\r{label}: {done}/{len(filePaths)} files", end='', file=sys.stderr, flush=True)
+    if SHOW_PROGRESS:
+        print(file=sys.stderr)
+    return results
+
+_resultsStore = (None, None)  # (process id, ResultsStore)
+
+def openResultsStore():
+    """Return this process's connection to the results store at RESULTS_STORE_PATH."""
+    global _resultsStore
+    if _resultsStore[0] != os.getpid() or _resultsStore[1].dbPath != RESULTS_STORE_PATH:
+        _resultsStore = (os.getpid(), resultsStore.ResultsStore(RESULTS_STORE_PATH))
+    return _resultsStore[1]
+
+def resultSettings(func, **extra):
+    """Return what a stored result of func depends on besides the file: code versions and the settings func uses."""
+    settings = {'function': func.__name__, 'results': RESULTS_VERSION, 'parser': PARSE_CACHE_VERSION, **extra}
+    if func in (extractEmd, extractEmdSamples):
+        settings.update(emdMode=EMD_MODE, emdOptions=emdOptions(), emdVersion=emdEngine.EMD_VERSION)
+    if func in TRAJECTORY_STAT_FUNCS:
+        settings.update(nearMissDistance=NEAR_MISS_DISTANCE, trajectoryVersion=TRAJECTORY_VERSION)
+    if func in (extractEmd, extractEmdSamples, *TRAJECTORY_STAT_FUNCS) and TIME_RANGE is not None:
+        settings['timeRange'] = list(TIME_RANGE)
+    return settings
+
+def _resultFingerprint(filePath):
+    """Return (absolute path, size, mtime, source), where source is 'binary' if the file's .bin copy is read instead."""
+    absPath, size, mtime = _fileFingerprint(filePath)
+    return absPath, size, mtime, 'binary' if currentSpatialBinary(absPath) is not None else 'text'
+
+def folderResults(folderPath, settings, worker, combine, jobs=None):
+    """Return combine([worker(filePath) for every data file in folderPath]), with files in listing order.
+    Worker results must be JSON-serializable. With USE_RESULTS_STORE, per-file results and the combined result are kept
+    in the results store under settings: unchanged files are not recomputed, and the combined result is only rebuilt
+    (from stored file results) when a file was added, changed or removed.
+    """
+    filePaths = listDataFiles(folderPath)
+    if not USE_RESULTS_STORE:
+        return combine(mapFiles(worker, filePaths, folderPath, jobs))
+    store, folder, metric = openResultsStore(), os.path.abspath(folderPath), settings['function']
+    fingerprints = [_resultFingerprint(filePath) for filePath in filePaths]
+    combined = store.groupResult(folder, metric, settings, fingerprints)
+    if combined is not None:
+        instrumentation.count('results.groupHits')
+        return combined
+    stored = store.fileResults(metric, settings, fingerprints)
+    missing = [i for i, fingerprint in enumerate(fingerprints) if fingerprint[0] not in stored]
+    instrumentation.count('results.fileHits', len(fingerprints) - len(missing))
+    instrumentation.count('results.filesComputed', len(missing))
+    computed = mapFiles(worker, [filePaths[i] for i in missing], folderPath, jobs)
+    store.putFileResults(metric, settings, [fingerprints[i] for i in missing], computed)
+    stored.update((fingerprints[i][0], result) for i, result in zip(missing, computed))
+    combined = combine([stored[fingerprint[0]] for fingerprint in fingerprints])
+    store.putGroupResult(folder, metric, settings, fingerprints, combined)
+    return combined
+
 def parseSpatialFile(filePath):
     """Parse a spatial log file into a dict: timeStamp -> list of (x, y) positions."""
+    columns = loadSpatialFile(filePath)
     positionsByTime = {}
-    with open(filePath) as file:
-        for line in file:
-            vals = line.strip().split(',')
-            if len(vals) < 7 or vals[5].strip() == '<null>' or vals[6].strip() == '<null>':
-                continue
-            try:
-                timeStamp = int(vals[4])
-                x, y = float(vals[5]), float(vals[6])
-                positionsByTime.setdefault(timeStamp, []).append((x, y))
-            except ValueError:
-                continue
+    for timeStamp, x, y in zip(columns['timeStamp'].tolist(), columns['x'].tolist(), columns['y'].tolist()):
+        positionsByTime.setdefault(timeStamp, []).append((x, y))
     return positionsByTime
 
+def emdOptions():
+    """Return the configured solver options for emdEngine."""
+    return {'projections': SLICED_PROJECTIONS, 'epsilon': SINKHORN_EPSILON,
+            'iterations': SINKHORN_ITERATIONS, 'batchFrames': SINKHORN_BATCH_FRAMES, 'maxBytes': SINKHORN_MAX_BYTES,
+            'unequal': EXACT_UNEQUAL_SIZES}
+
 def computeWasserstein(positionsA, positionsB):
     """Compute Wasserstein EMD between two 2D point sets."""
-    if not positionsA.size or not positionsB.size:
-        return None
-    costMatrix = cdist(positionsA, positionsB)
-    rowInd, colInd = linear_sum_assignment(costMatrix)
-    return costMatrix[rowInd, colInd].mean()
+    values = emdEngine.frameEmds([positionsA], positionsB, EMD_MODE, **emdOptions())
+    return values[0] if values else None
+
+def _cachedSpatialFrames(columns):
+    """Yield (timeStamp, positions) frames from cached spatial columns, one contiguous time step at a time."""
+    timeStamps = columns['timeStamp']
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(timeStamps)) + 1, [len(timeStamps)]))
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        if end > start:
+            yield int(timeStamps[start]), np.column_stack((columns['x'][start:end], columns['y'][start:end]))
+
+def _textSpatialFrames(filePath, fingerprint=None):
+    """Yield (timeStamp, positions) frames while reading a spatial text log line by line.
+    Counted like a full parse (see _readRows), including when the caller stops early.
+    With the file's fingerprint, the rows read are also stored as its parse cache entry once the whole file has
+    been read (the same columns as _parseSpatialText), so the file is never parsed from text again.
+    """
+    lines, rows, invalid = 0, 0, 0
+    currentTime, positions = None, []
+    firstLine, droneIDs, frames, frameTimes = [], [], [], []
+    try:
+        with open(filePath) as file:
+            for line in file:
+                lines += 1
+                vals = line.strip().split(',')
+                if lines == 1:
+                    firstLine = vals
+                if len(vals) < 7:
+                    continue
+                rows += 1
+                try:
+                    timeStamp, x, y = float(vals[4]), float(vals[5]), float(vals[6])
+                except ValueError:
+                    invalid += 1
+                    continue
+                if not (np.isfinite(x) and np.isfinite(y) and np.isfinite(timeStamp)) or timeStamp != int(timeStamp):
+                    invalid += 1
+                    continue
+                if int(timeStamp) != currentTime:
+                    if positions:
+                        frames.append(np.array(positions))
+                        frameTimes.append(currentTime)
+                        yield currentTime, frames[-1]
+                    currentTime, positions = int(timeStamp), []
+                positions.append((x, y))
+                if fingerprint is not None:
+                    droneIDs.append(vals[3])
+        if positions:
+            frames.append(np.array(positions))
+            frameTimes.append(currentTime)
+            yield currentTime, frames[-1]
+        if fingerprint is not None:
+            instrumentation.count('parseCache.misses')
+            positions = np.concatenate(frames) if frames else np.empty((0, 2))
+            columns = {
+                'droneID': np.array(droneIDs, dtype=str),
+                'timeStamp': np.repeat(np.array(frameTimes, dtype=np.int64), [len(frame) for frame in frames]),
+                'x': positions[:, 0].copy(),
+                'y': positions[:, 1].copy()
+            }
+            _writeCacheEntry(*fingerprint, 'spatial', columns, firstLine)
+    finally:
+        instrumentation.count('parse.filesRead')
+        instrumentation.count('parse.rows', rows)
+        instrumentation.count('parse.shortRowsSkipped', lines - rows)
+        instrumentation.count('parse.invalidPositionRows', invalid)
+
+def iterSpatialFrames(filePath, timeRange=None):
+    """Yield (timeStamp, positions) for each time step of a spatial file, where positions is an (n, 2) array.
+    The logger writes rows in time order, so frames are yielded as they are read. Frames come from the binary copy
+    or parse cache when one is up to date, otherwise straight from the text file, which then fills the parse cache.
+    With an inclusive (min, max) ms timeRange, only those frames are returned: sliced from the binary copy or parse
+    cache, or, when the file is in the manifest, read from just their bytes.
+    """
+    data = currentSpatialBinary(filePath)
+    if data is not None:
+        instrumentation.count('spatialBinary.filesRead')
+        yield from spatialBinary.iterFrames(data, timeRange)
+        return
+    if USE_PARSE_CACHE:
+        absPath, size, mtime = _fileFingerprint(filePath)
+        meta = _readCacheMeta(absPath, size, mtime)
+        if meta is not None and meta.get('kind') == 'spatial':
+            try:
+                columns = _loadCacheColumns(absPath, meta)
+            except (OSError, ValueError):
+                columns = None
+            if columns is not None:
+                _countCacheHit(columns)
+                if timeRange is not None:
+                    keep = _timeMask(columns['timeStamp'], timeRange)
+                    columns = {name: columns[name][keep] for name in ('timeStamp', 'x', 'y')}
+                yield from _cachedSpatialFrames(columns)
+                return
+    if timeRange is not None:
+        if USE_MANIFEST and openManifest().lookup(filePath) is not None:
+            yield from openManifest().iterFrames(filePath, timeRange)
+            return
+        for timeStamp, positions in iterSpatialFrames(filePath):
+            if _inRange(timeStamp, timeRange):
+                yield timeStamp, positions
+        return
+    yield from _textSpatialFrames(filePath, _fileFingerprint(filePath) if USE_PARSE_CACHE else None)
+
+def _timeMask(timeStamps, timeRange):
+    """Return a boolean mask of the time stamps in an inclusive (min, max) ms range (either end can be None)."""
+    low, high = timeRange
+    keep = np.ones(len(timeStamps), dtype=bool)
+    if low is not None:
+        keep &= timeStamps >= low
+    if high is not None:
+        keep &= timeStamps <= high
+    return keep
+
+def spatialFrames(filePath, timeRange=None):
+    """Return the (n, 2) position arrays of a spatial file, one per time step in time order."""
+    return [frame for _, frame in iterSpatialFrames(filePath, timeRange)]
 
 # --- Data Extraction Functions ---
 
+def validExitTimes(columns):
+    """Return the exit times of all drones that left the field."""
+    exitTime = columns['exitTime']
+    return exitTime[np.isfinite(exitTime)]
+
+def validTraversalTimes(columns):
+    """Return the non-negative traversal times (exit-entry) of all drones that left the field."""
+    traversal = columns['exitTime'] - columns['entryTime']
+    return traversal[np.isfinite(traversal) & (traversal >= 0)]
+
 def extractMakespan(filePath):
     """Return makespan (last exit - first exit) for valid lines in file, or None if invalid."""
-    minExit, maxExit = float('inf'), float('-inf')
-    with open(filePath) as file:
-        for line in file:
-            vals = line.strip().split(',')
-            if len(vals) < 6 or vals[5].strip() == '<null>':
-                continue
-            try:
-                exitTime = float(vals[5])
-                minExit = min(minExit, exitTime)
-                maxExit = max(maxExit, exitTime)
-            except ValueError:
-                continue
-    return maxExit - minExit if minExit != float('inf') and maxExit != float('-inf') else None
+    exitTimes = validExitTimes(loadMakespanFile(filePath))
+    return exitTimes.max() - exitTimes.min() if exitTimes.size else None
 
 def extractTraversal(filePath):
     """Return average traversal time (exit-entry) for valid lines in file, or None if invalid."""
-    traversalTimes = []
-    with open(filePath) as file:
-        for line in file:
-            vals = line.strip().split(',')
-            if len(vals) < 6 or vals[5].strip() == '<null>':
-                continue
+    traversalTimes = validTraversalTimes(loadMakespanFile(filePath))
+    return np.mean(traversalTimes) if traversalTimes.size else None
+
+_emdMemoryCache = OrderedDict()
+
+def _emdSeriesKey(absPath, size, mtime, referenceArray):
+    """Return the memoization key of an EMD series: file fingerprint, reference choice and solver settings."""
+    if referenceArray is None:
+        reference = 'first'
+    else:
+        reference = hashlib.sha1(np.ascontiguousarray(referenceArray, dtype=np.float64).tobytes()).hexdigest()
+    source = 'binary' if currentSpatialBinary(absPath) is not None else 'text'  # float32 positions can shift results slightly
+    settings = [absPath, size, mtime, reference, source, EMD_MODE, emdOptions(), emdEngine.EMD_VERSION]
+    if TIME_RANGE is not None:
+        settings.append(list(TIME_RANGE))
+    settings = json.dumps(settings, sort_keys=True)
+    return hashlib.sha1(settings.encode('utf-8')).hexdigest()
+
+def _computeEmdSeries(filePath, referenceArray):
+    """Solve the EMD of every time step in a spatial file (those in TIME_RANGE) against the reference (first time step
+    of the file by default). Frames are solved as they are read, so memory use does not grow with the length of the simulation.
+    """
+    if referenceArray is None and TIME_RANGE is not None:
+        referenceArray = next((frame for _, frame in iterSpatialFrames(filePath)), None)
+        if referenceArray is None:
+            return np.empty(0)
+    framesIter = (frame for _, frame in iterSpatialFrames(filePath, TIME_RANGE))
+    if referenceArray is None:
+        referenceArray = next(framesIter, None)
+        if referenceArray is None:
+            return np.empty(0)
+        framesIter = chain([referenceArray], framesIter)
+    return np.fromiter(emdEngine.streamFrameEmds(framesIter, referenceArray, EMD_MODE, **emdOptions()), dtype=np.float64)
+
+def emdSeries(filePath, referenceArray=None):
+    """Return the per-time-step EMD values of a spatial file as a read-only array.
+    Series are memoized in a bounded in-memory LRU and stored next to the parse cache entry of the file,
+    so no frame is solved twice for the same file, reference and solver settings.
+    """
+    absPath, size, mtime = _fileFingerprint(filePath)
+    key = _emdSeriesKey(absPath, size, mtime, referenceArray)
+    if key in _emdMemoryCache:
+        _emdMemoryCache.move_to_end(key)
+        instrumentation.count('emdCache.memoryHits')
+        return _emdMemoryCache[key]
+    series = None
+    seriesPath = os.path.join(_cacheEntryFolder(absPath), f'emd-{key}.npy')
+    if USE_PARSE_CACHE:
+        try:
+            series = np.load(seriesPath)
+            instrumentation.count('emdCache.diskHits')
+        except (OSError, ValueError):
+            series = None
+    if series is None:
+        instrumentation.count('emdCache.misses')
+        with instrumentation.timed('emd.series'):
+            series = _computeEmdSeries(absPath, referenceArray)
+        if USE_PARSE_CACHE:
             try:
-                entryTime, exitTime = float(vals[4]), float(vals[5])
-                traversal = exitTime - entryTime
-                if traversal >= 0:
-                    traversalTimes.append(traversal)
-            except ValueError:
-                continue
-    return np.mean(traversalTimes) if traversalTimes else None
+                os.makedirs(os.path.dirname(seriesPath), exist_ok=True)
+                tmpPath = seriesPath + f'.{os.getpid()}.tmp'
+                with open(tmpPath, 'wb') as file:
+                    np.save(file, series)
+                os.replace(tmpPath, seriesPath)
+            except OSError as error:
+                print(f"Warning: could not store EMD series for '{absPath}': {error}")
+    series.flags.writeable = False
+    _emdMemoryCache[key] = series
+    if len(_emdMemoryCache) > EMD_MEMORY_CACHE_SIZE:
+        _emdMemoryCache.popitem(last=False)
+    return series
 
 def extractEmd(filePath, referenceArray=None):
     """Return average EMD over all time steps in a spatial file."""
-    positionsByTime = parseSpatialFile(filePath)
-    if not positionsByTime:
-        return None
-    if referenceArray is None:
-        # Use the first non-empty time step as reference
-        for t in sorted(positionsByTime):
-            arr = np.array(positionsByTime[t])
-            if arr.size > 0:
-                referenceArray = arr
-                break
-        else:
-            return None
-    emdVals = []
-    for t in sorted(positionsByTime):
-        positionsArray = np.array(positionsByTime[t])
-        emd = computeWasserstein(positionsArray, referenceArray)
-        if emd is not None:
-            emdVals.append(emd)
-    return np.mean(emdVals) if emdVals else None
-
-def folderStats(folderPath, xAxis, statFunc):
-    """Return list of (x, stat) for all .txt files in folder using statFunc."""
-    data = []
-    for fileName in os.listdir(folderPath):
-        if not fileName.endswith('.txt'):
-            continue
-        filePath = os.path.join(folderPath, fileName)
-        xValue = readFirstLineValue(filePath, xAxis)
-        if xValue is None:
-            continue
+    series = emdSeries(filePath, referenceArray)
+    return np.mean(series) if series.size else None
+
+@lru_cache(maxsize=TRAJECTORY_MEMORY_CACHE_SIZE)
+def _trajectoryMetrics(absPath, size, mtime, source, nearMissDistance, timeRange=None):
+    """Compute trajectory metrics (of the rows in timeRange). Memoized on the file fingerprint, its source ('text'
+    or 'binary'), the settings and TRAJECTORY_VERSION, and stored next to the parse cache entry, so worker processes
+    do not recompute them for every metric, see loadTrajectoryMetrics().
+    """
+    import trajectoryMetrics
+    settings = [absPath, size, mtime, source, nearMissDistance, TRAJECTORY_VERSION]
+    if timeRange is not None:
+        settings.append(list(timeRange))
+    key = hashlib.sha1(json.dumps(settings).encode('utf-8')).hexdigest()
+    metricsPath = os.path.join(_cacheEntryFolder(absPath), f'trajectory-{key}.npz')
+    if USE_PARSE_CACHE:
+        try:
+            with np.load(metricsPath) as stored:
+                instrumentation.count('trajectoryCache.hits')
+                return _freezeColumns(dict(stored))
+        except (OSError, ValueError):
+            pass
+    columns = loadSpatialFile(absPath)
+    if timeRange is not None:
+        keep = _timeMask(columns['timeStamp'], timeRange)
+        columns = {name: column[keep] for name, column in columns.items()}
+    with instrumentation.timed('trajectory.tracks'):
+        metrics = trajectoryMetrics.droneTracks(columns['droneID'], columns['timeStamp'], columns['x'], columns['y'])
+    with instrumentation.timed('trajectory.proximity'):
+        metrics.update(trajectoryMetrics.proximitySeries(iterSpatialFrames(absPath, timeRange), nearMissDistance))
+    if USE_PARSE_CACHE:
+        try:
+            os.makedirs(os.path.dirname(metricsPath), exist_ok=True)
+            tmpPath = metricsPath + f'.{os.getpid()}.tmp.npz'
+            np.savez(tmpPath, **metrics)
+            os.replace(tmpPath, metricsPath)
+        except OSError as error:
+            print(f"Warning: could not store trajectory metrics for '{absPath}': {error}")
+    return _freezeColumns(metrics)
+
+def loadTrajectoryMetrics(filePath):
+    """Return the trajectory metrics of a spatial file as a dict of arrays.
+    Per drone: droneIDs, pathLength, duration (ms), meanSpeed (units/s).
+    Per time step: timeStamp, minSeparation (closest pair) and nearMisses (pairs within NEAR_MISS_DISTANCE).
+    Only the rows in TIME_RANGE are used.
+    """
+    return _trajectoryMetrics(*_resultFingerprint(filePath), NEAR_MISS_DISTANCE, None if TIME_RANGE is None else tuple(TIME_RANGE))
+
+def extractPathLength(filePath):
+    """Return the average path length of the drones in a spatial file."""
+    pathLength = loadTrajectoryMetrics(filePath)['pathLength']
+    return np.mean(pathLength) if pathLength.size else None
+
+def extractSpeed(filePath):
+    """Return the average of the drones' mean speeds (units per second) in a spatial file."""
+    speed = loadTrajectoryMetrics(filePath)['meanSpeed']
+    speed = speed[np.isfinite(speed)]
+    return np.mean(speed) if speed.size else None
+
+def extractMinSeparation(filePath):
+    """Return the smallest distance between any two drones over a whole spatial file."""
+    separation = loadTrajectoryMetrics(filePath)['minSeparation']
+    separation = separation[np.isfinite(separation)]
+    return np.min(separation) if separation.size else None
+
+def extractNearMisses(filePath):
+    """Return the number of near misses (drone pairs within NEAR_MISS_DISTANCE, counted per time step) in a spatial file."""
+    nearMisses = loadTrajectoryMetrics(filePath)['nearMisses']
+    return int(nearMisses.sum()) if nearMisses.size else None
+
+def _fileStatWorker(statFunc, filePath):
+    """Return [droneCount, angle, stat] for one file, with None for missing values."""
+    droneCount, angle = readFirstLineValue(filePath, 'droneCount'), readFirstLineValue(filePath, 'angle')
+    if droneCount is None and angle is None:
+        return [None, None, None]
+    with instrumentation.timed('extract.' + statFunc.__name__):
         stat = statFunc(filePath)
-        if stat is not None:
-            data.append((xValue, stat))
-    return data
+    return [droneCount, angle, stat.item() if isinstance(stat, np.generic) else stat]
+
+def folderStats(folderPath, xAxis, statFunc, jobs=None):
+    """Return list of (x, stat) for all .txt files in folder using statFunc.
+    Values are read from the results store, so only new or changed files are computed.
+    """
+    rows = folderResults(folderPath, resultSettings(statFunc), partial(_fileStatWorker, statFunc), list, jobs)
+    column = 0 if xAxis == 'droneCount' else 1
+    return [(row[column], row[2]) for row in rows if row[column] is not None and row[2] is not None]
+
+def cellStats(folderPath, statFunc, jobs=None):
+    """Return {(droneCount, angle): [stat per file]} for all .txt files in folder, i.e., the replicates of every cell.
+    Shares stored results with folderStats().
+    """
+    cells = {}
+    for droneCount, angle, stat in folderResults(folderPath, resultSettings(statFunc), partial(_fileStatWorker, statFunc), list, jobs):
+        if droneCount is not None and angle is not None and stat is not None:
+            cells.setdefault((droneCount, angle), []).append(stat)
+    return cells
 
 # --- Plotting Functions ---
 
+def describeSamples(values):
+    """Return descriptive statistics for a list of samples or an OnlineStats summary, or None if there is no data."""
+    if isinstance(values, OnlineStats):
+        if not values.count:
+            return None
+        return {
+            'Count': values.count,
+            'Mean': values.mean,
+            'Std': values.std(),
+            'Min': values.min,
+            '25%': values.quantile(0.25),
+            'Median': values.quantile(0.5),
+            '75%': values.quantile(0.75),
+            'Max': values.max
+        }
+    arr = np.array(values)
+    if arr.size == 0:
+        return None
+    return {
+        'Count': len(arr),
+        'Mean': np.mean(arr),
+        'Std': np.std(arr, ddof=1) if len(arr) > 1 else 0.0,
+        'Min': np.min(arr),
+        '25%': np.percentile(arr, 25),
+        'Median': np.median(arr),
+        '75%': np.percentile(arr, 75),
+        'Max': np.max(arr)
+    }
+
 def printDescriptiveStats(title, dataDict):
-    """Print descriptive statistics for each group in a pretty way with a title."""
+    """Print descriptive statistics for each group in a pretty way with a title.
+    Groups can be lists of samples or OnlineStats summaries.
+    """
     # Print a formatted table of stats for each group (e.g., strategy)
     print(f"\n=== {title} ===")
     for group, values in dataDict.items():
-        arr = np.array(values)
-        if arr.size == 0:
+        stats = describeSamples(values)
+        if stats is None:
             print(f"{group}: No data.")
             continue
-        # Compute and print common descriptive statistics
-        stats = {
-            'Count': len(arr),
-            'Mean': np.mean(arr),
-            'Std': np.std(arr, ddof=1) if len(arr) > 1 else 0.0,
-            'Min': np.min(arr),
-            '25%': np.percentile(arr, 25),
-            'Median': np.median(arr),
-            '75%': np.percentile(arr, 75),
-            'Max': np.max(arr)
-        }
         print(f"{group}:")
         for k, v in stats.items():
             print(f"  {k:>6}: {v:>10.3f}" if isinstance(v, float) else f"  {k:>6}: {v}")
 
-def plotScatter(data, title, xLabel, yLabel, xIntTicks=False):
-    """Reusable scatter plot with best-fit line and descriptive stats."""
-    # Early exit if no data
-    if not data:
-        print(f"No data for {title}"); return
-    xValues, yValues = zip(*data)
-    # Print stats for y-values (dependent variable)
-    printDescriptiveStats(title, {yLabel: yValues})
-    plt.figure(figsize=FIGURE_SIZE)
-    plt.scatter(xValues, yValues, label='Data Points', color=PLOT_COLORS[0])  # Data points (same as box color)
+def plotSettings():
+    """Return the plot settings a figure depends on (part of its render hash)."""
+    return {
+        'colors': PLOT_COLORS, 'figureSize': list(FIGURE_SIZE), 'boxWidth': BOX_WIDTH, 'fontSize': FONT_SIZE,
+        'bestFitDegree': BEST_FIT_DEGREE, 'bestFitLabel': BEST_FIT_LABEL.get(BEST_FIT_DEGREE, 'Best Fit'),
+        'showMeans': SHOW_MEANS, 'showLegend': SHOW_LEGEND, 'showBand': SHOW_CONFIDENCE_BAND, 'confidence': CONFIDENCE_LEVEL
+    }
+
+def drawScatter(spec):
+    """Draw a scatter plot with best-fit line from a figure spec and return the figure."""
+    import matplotlib.pyplot as plt
+    settings, xValues, yValues = spec['settings'], spec['x'], spec['y']
+    fig = plt.figure(figsize=settings['figureSize'])
+    plt.scatter(xValues, yValues, label='Data Points', color=settings['colors'][0])  # Data points (same as box color)
     # Add best-fit line if more than one point
     if len(xValues) > 1:
-        coeffs = np.polyfit(xValues, yValues, BEST_FIT_DEGREE)
+        with instrumentation.timed('plot.polyfit'):
+            coeffs = np.polyfit(xValues, yValues, settings['bestFitDegree'])
         poly = np.poly1d(coeffs)
         xFit = np.linspace(min(xValues), max(xValues), 100)
-        plt.plot(xFit, poly(xFit), color=PLOT_COLORS[1], label=BEST_FIT_LABEL.get(BEST_FIT_DEGREE, 'Best Fit'))  # Best-fit line (same as median)
-    plt.title(title, fontsize=FONT_SIZE)
-    plt.xlabel(xLabel, fontsize=FONT_SIZE)
-    plt.ylabel(yLabel, fontsize=FONT_SIZE)
+        plt.plot(xFit, poly(xFit), color=settings['colors'][1], label=settings['bestFitLabel'])  # Best-fit line (same as median)
+    if spec.get('band') is not None:
+        band = spec['band']
+        plt.fill_between(band['x'], band['low'], band['high'], color=settings['colors'][1], alpha=0.2,
+                         label=f"{settings['confidence']:.0%} Confidence Band")
+    plt.title(spec['title'], fontsize=settings['fontSize'])
+    plt.xlabel(spec['xLabel'], fontsize=settings['fontSize'])
+    plt.ylabel(spec['yLabel'], fontsize=settings['fontSize'])
     # Set x-axis ticks for integer-based axes
-    if xIntTicks:
+    if spec['xIntTicks']:
         xMin, xMax = int(min(xValues)), int(max(xValues))
-        if xLabel.startswith('Drone Count'):
+        if spec['xLabel'].startswith('Drone Count'):
             plt.xticks(np.arange(0, xMax+1, 5))
         else:
             step = 5 if xMax - xMin > 6 else 1
             plt.xticks(np.arange(xMin, xMax+1, step))
-    if SHOW_LEGEND:
+    if settings['showLegend']:
         plt.legend()
-    plt.show()
+    return fig
 
-def plotBox(samplesDict, title, yLabel):
-    """Reusable boxplot with descriptive stats for each group (e.g., strategy)."""
-    printDescriptiveStats(title, samplesDict)
-    plt.figure(figsize=FIGURE_SIZE)
-    plt.boxplot(
-        [samplesDict['centralized'], samplesDict['decentralized']],
-        tick_labels=['Centralized', 'Decentralized'],
+def plotScatter(data, title, xLabel, yLabel, xIntTicks=False):
+    """Reusable scatter plot with best-fit line and descriptive stats."""
+    # Early exit if no data
+    if not data:
+        print(f"No data for {title}"); return
+    xValues, yValues = zip(*data)
+    # Print stats for y-values (dependent variable)
+    printDescriptiveStats(title, {yLabel: yValues})
+    showFigure({
+        'kind': 'scatter', 'title': title, 'xLabel': xLabel, 'yLabel': yLabel, 'xIntTicks': xIntTicks,
+        'x': [float(x) for x in xValues], 'y': [float(y) for y in yValues], 'settings': plotSettings()
+    })
+
+def boxStats(summary, label):
+    """Return matplotlib bxp() statistics for an OnlineStats summary.
+    Whiskers are clipped to 1.5 IQR as in a regular boxplot; outliers are not kept in a summary, so none are drawn.
+    """
+    q1, median, q3 = summary.quantile(0.25), summary.quantile(0.5), summary.quantile(0.75)
+    iqr = q3 - q1
+    return {
+        'label': label, 'mean': summary.mean, 'med': median, 'q1': q1, 'q3': q3,
+        'whislo': max(summary.min, q1 - 1.5 * iqr), 'whishi': min(summary.max, q3 + 1.5 * iqr), 'fliers': []
+    }
+
+def drawBox(spec):
+    """Draw a boxplot from a figure spec (raw samples or precomputed bxp() statistics) and return the figure."""
+    import matplotlib.pyplot as plt
+    settings = spec['settings']
+    colors = settings['colors']
+    fig = plt.figure(figsize=settings['figureSize'])
+    style = dict(
         patch_artist=True,
-        showmeans=SHOW_MEANS,
+        showmeans=settings['showMeans'],
         meanprops={"marker":"o","markerfacecolor":"white","markeredgecolor":"black"},
-        widths=BOX_WIDTH,
-        boxprops=dict(color=PLOT_COLORS[0], facecolor=PLOT_COLORS[0]), # Box color (same as scatter data points)
-        medianprops=dict(color=PLOT_COLORS[1]), # Median line (same as best-fit line)
-        whiskerprops=dict(color=PLOT_COLORS[2]), # Whiskers
-        capprops=dict(color=PLOT_COLORS[2]), # Caps
-        flierprops=dict(markerfacecolor=PLOT_COLORS[3], marker='o') # Outliers
+        widths=settings['boxWidth'],
+        boxprops=dict(color=colors[0], facecolor=colors[0]), # Box color (same as scatter data points)
+        medianprops=dict(color=colors[1]), # Median line (same as best-fit line)
+        whiskerprops=dict(color=colors[2]), # Whiskers
+        capprops=dict(color=colors[2]), # Caps
+        flierprops=dict(markerfacecolor=colors[3], marker='o') # Outliers
     )
-    plt.title(title, fontsize=FONT_SIZE)
-    plt.ylabel(yLabel, fontsize=FONT_SIZE)
-    plt.xlabel('Strategy', fontsize=FONT_SIZE)
-    plt.show()
+    if spec['boxStats'] is not None:
+        plt.gca().bxp(spec['boxStats'], **style)
+    else:
+        plt.boxplot(spec['groups'], tick_labels=spec['labels'], **style)
+    plt.title(spec['title'], fontsize=settings['fontSize'])
+    plt.ylabel(spec['yLabel'], fontsize=settings['fontSize'])
+    plt.xlabel('Strategy', fontsize=settings['fontSize'])
+    return fig
+
+def plotBox(samplesDict, title, yLabel):
+    """Reusable boxplot with descriptive stats for each group (e.g., strategy).
+    Groups can be lists of samples or OnlineStats summaries.
+    """
+    # Early exit if no data
+    if not samplesDict:
+        print(f"No data for {title}"); return
+    printDescriptiveStats(title, samplesDict)
+    groups = list(samplesDict.values())
+    labels = [strategy.capitalize() for strategy in samplesDict]
+    spec = {'kind': 'box', 'title': title, 'yLabel': yLabel, 'labels': labels, 'settings': plotSettings()}
+    if all(isinstance(group, OnlineStats) for group in groups):
+        spec['boxStats'], spec['groups'] = [boxStats(group, label) for group, label in zip(groups, labels)], None
+    else:
+        spec['boxStats'], spec['groups'] = None, [[float(value) for value in group] for group in groups]
+    showFigure(spec)
+
+# --- Figure Rendering ---
+
+FIGURE_DRAWERS = {'scatter': drawScatter, 'box': drawBox}
+FIGURE_HASH_FILE = '.figureHashes.json'
+_pendingFigures = []
+
+def _hasBand(spec):
+    """Return whether a figure spec gets a confidence band: a scatter plot with the band on and enough points to fit."""
+    return spec['kind'] == 'scatter' and spec['settings']['showBand'] and len(set(spec['x'])) > spec['settings']['bestFitDegree']
+
+def figureHash(spec):
+    """Return a hash of everything a figure is drawn from: its data, titles, labels and plot settings.
+    A confidence band is represented by the settings it is computed from, so it does not have to be computed first.
+    """
+    band = {'resamples': BOOTSTRAP_RESAMPLES, 'confidence': CONFIDENCE_LEVEL, 'seed': BOOTSTRAP_SEED} if _hasBand(spec) else None
+    return hashlib.sha1(json.dumps({**spec, 'band': band}, sort_keys=True, default=float).encode()).hexdigest()
+
+def addConfidenceBands(specs):
+    """Add the bootstrap confidence band of the best-fit line to every scatter spec with enough points to fit.
+    All figures are resampled and fitted together in one batched call (see bootstrap.bootstrapFits).
+    """
+    specs = [spec for spec in specs if _hasBand(spec)]
+    if not specs:
+        return
+    with instrumentation.timed('plot.bootstrap'):
+        fits = bootstrap.bootstrapFits([(spec['x'], spec['y']) for spec in specs], BEST_FIT_DEGREE, BOOTSTRAP_RESAMPLES,
+                                       CONFIDENCE_LEVEL, BOOTSTRAP_SEED)
+    for i, spec in enumerate(specs):
+        spec['band'] = {'x': fits['gridX'][i].tolist(), 'low': fits['bandLow'][i].tolist(), 'high': fits['bandHigh'][i].tolist()}
+
+def showFigure(spec):
+    """Show a figure interactively, or queue it for renderFigures() when RENDER_FOLDER is set."""
+    if RENDER_FOLDER is None:
+        import matplotlib.pyplot as plt
+        addConfidenceBands([spec])
+        with instrumentation.timed('plot.draw'):
+            FIGURE_DRAWERS[spec['kind']](spec)
+        with instrumentation.timed('plot.show'):
+            plt.show()
+    else:
+        _pendingFigures.append(spec)
+
+def _renderFigure(item):
+    """Draw one figure spec with a non-interactive backend and save it to the given path."""
+    import matplotlib.pyplot as plt
+    spec, path = item
+    if plt.get_backend().lower() != 'agg':
+        plt.switch_backend('Agg')
+    with instrumentation.timed('plot.draw'):
+        fig = FIGURE_DRAWERS[spec['kind']](spec)
+    with instrumentation.timed('plot.save'):
+        fig.savefig(path, dpi=FIGURE_DPI)
+    plt.close(fig)
+    return path
+
+def renderFigures(folder=None, figureFormat=None, jobs=None):
+    """Write every queued figure to folder as PNG, SVG or PDF, skipping figures whose hash matches the last render.
+    File names come from the figure titles. Figures are drawn in parallel with jobs > 1. Returns the paths written.
+    """
+    folder = RENDER_FOLDER if folder is None else folder
+    figureFormat = FIGURE_FORMAT if figureFormat is None else figureFormat
+    specs = list(_pendingFigures)
+    _pendingFigures.clear()
+    os.makedirs(folder, exist_ok=True)
+    hashPath = os.path.join(folder, FIGURE_HASH_FILE)
+    try:
+        with open(hashPath) as file:
+            previous = json.load(file)
+    except (OSError, ValueError):
+        previous = {}
+    hashes, toRender = {}, []
+    for spec in specs:
+        name = re.sub(r'[^A-Za-z0-9]+', '-', spec['title']).strip('-') or 'figure'
+        # Titles can repeat (e.g., across strategies), so later figures get a numeric suffix
+        fileName, suffix = f"{name}.{figureFormat}", 2
+        while fileName in hashes:
+            fileName, suffix = f"{name}-{suffix}.{figureFormat}", suffix + 1
+        hashes[fileName] = figureHash(spec)
+        if previous.get(fileName) != hashes[fileName] or not os.path.exists(os.path.join(folder, fileName)):
+            toRender.append((spec, os.path.join(folder, fileName)))
+    # Bands are only computed for the figures that are redrawn
+    addConfidenceBands([spec for spec, _ in toRender])
+    written = mapFiles(_renderFigure, toRender, 'figures', jobs)
+    with open(hashPath, 'w') as file:
+        json.dump({**previous, **hashes}, file, indent=1, sort_keys=True)
+    print(f"Rendered {len(written)} of {len(specs)} figures to {folder} ({len(specs) - len(written)} unchanged)")
+    return written
 
 # --- Analysis Functions ---
 
-def analyzeFixed(folderType, rootFolder, strategies, xAxis, statFuncs, plotFuncs, plotTitles, xLabel, yLabels, xIntTicks=False):
+def analyzeFixed(folderType, rootFolder, strategies, xAxis, statFuncs, plotFuncs, plotTitles, xLabel, yLabels, xIntTicks=False,
+                 spatialStatFuncs=(), spatialTitles=(), spatialYLabels=()):
     """Generalized analysis for bothFixed, angleFixed, and countFixed folders.
-    For each strategy, computes and plots stats for makespan, traversal, and EMD.
+    For each strategy, computes and plots stats for makespan, traversal, and EMD,
+    plus any extra per-file spatial stats (e.g., trajectory metrics).
     """
     for strategy in strategies:
         # Build paths for makespan and spatial data for this strategy and folder type
-        pathMakespan = os.path.join(rootFolder, 'Makespan', strategy, folderType)
-        pathSpatial = os.path.join(rootFolder, 'Spatial', strategy, folderType)
+        pathMakespan = dataFolder(rootFolder, MAKESPAN_DIR, strategy, folderType)
+        pathSpatial = dataFolder(rootFolder, SPATIAL_DIR, strategy, folderType)
         # For makespan and traversal, plot for each stat function
         if os.path.isdir(pathMakespan):
             for statFunc, plotFunc, plotTitle, yLabel in zip(statFuncs, plotFuncs, plotTitles, yLabels):
-                data = folderStats(pathMakespan, xAxis, statFunc)
+                with instrumentation.timed('stage.' + folderType):
+                    data = folderStats(pathMakespan, xAxis, statFunc)
                 plotFunc(data, plotTitle.format(strategy), xLabel, yLabel, xIntTicks)
         # For EMD, plot EMD vs. x-axis
         if os.path.isdir(pathSpatial):
-            emdData = folderStats(pathSpatial, xAxis, extractEmd)
+            with instrumentation.timed('stage.' + folderType):
+                emdData = folderStats(pathSpatial, xAxis, extractEmd)
             plotScatter(emdData, plotTitles[-1].format(strategy), xLabel, yLabels[-1], xIntTicks)
+            for statFunc, plotTitle, yLabel in zip(spatialStatFuncs, spatialTitles, spatialYLabels):
+                with instrumentation.timed('stage.' + folderType):
+                    data = folderStats(pathSpatial, xAxis, statFunc)
+                plotScatter(data, plotTitle.format(strategy.capitalize()), xLabel, yLabel, xIntTicks)
 
 def extractMakespanSamples(filePath):
     """Return a list of exit times for all drones in the file (for margin of error calculation)."""
-    exitTimes = []
-    with open(filePath) as file:
-        for line in file:
-            vals = line.strip().split(',')
-            if len(vals) < 6 or vals[5].strip() == '<null>':
-                continue
-            try:
-                exitTime = float(vals[5])
-                exitTimes.append(exitTime)
-            except ValueError:
-                continue
-    return exitTimes
+    return validExitTimes(loadMakespanFile(filePath)).tolist()
 
 def extractTraversalSamples(filePath):
     """Return a list of traversal times (exit-entry) for all drones in the file (for margin of error calculation)."""
-    traversalTimes = []
-    with open(filePath) as file:
-        for line in file:
-            vals = line.strip().split(',')
-            if len(vals) < 6 or vals[5].strip() == '<null>':
-                continue
-            try:
-                entryTime, exitTime = float(vals[4]), float(vals[5])
-                traversal = exitTime - entryTime
-                if traversal >= 0:
-                    traversalTimes.append(traversal)
-            except ValueError:
-                continue
-    return traversalTimes
+    return validTraversalTimes(loadMakespanFile(filePath)).tolist()
 
 def extractEmdSamples(filePath, referenceArray=None):
     """Return a list of EMD values for all time steps in a spatial file (for margin of error calculation)."""
-    positionsByTime = parseSpatialFile(filePath)
-    if not positionsByTime:
-        return []
-    if referenceArray is None:
-        for t in sorted(positionsByTime):
-            arr = np.array(positionsByTime[t])
-            if arr.size > 0:
-                referenceArray = arr
-                break
-        else:
-            return []
-    emdVals = []
-    for t in sorted(positionsByTime):
-        positionsArray = np.array(positionsByTime[t])
-        emd = computeWasserstein(positionsArray, referenceArray)
-        if emd is not None:
-            emdVals.append(emd)
-    return emdVals
-
-def getStrategySamples(folderPath, sampleFunc):
+    return emdSeries(filePath, referenceArray).tolist()
+
+def reportEmdError(folderPath, mode=None):
+    """Print the error of an approximate EMD mode against the exact solver for every spatial file in a folder."""
+    mode = EMD_MODE if mode is None else mode
+    print(f"\n=== EMD error ({mode} vs. exact): {folderPath} ===")
+    for filePath in listDataFiles(folderPath):
+        reference = next((frame for _, frame in iterSpatialFrames(filePath) if frame.size > 0), None)
+        if reference is None:
+            continue
+        framesList = spatialFrames(filePath, TIME_RANGE)
+        report = emdEngine.compareToExact(framesList, reference, mode, **emdOptions())
+        print(f"{os.path.basename(filePath)}: frames={report['frames']} meanAbs={report['meanAbsError']:.4f} "
+              f"maxAbs={report['maxAbsError']:.4f} meanRel={report['meanRelError']:.2%} "
+              f"time={report['approxSeconds']:.3f}s (exact {report['exactSeconds']:.3f}s)")
+
+def getStrategySamples(folderPath, sampleFunc, jobs=None):
     """Aggregate all samples for a strategy from all .txt files in a folder."""
     samples = []
-    for fileName in os.listdir(folderPath):
-        if not fileName.endswith('.txt'):
-            continue
-        filePath = os.path.join(folderPath, fileName)
-        samples.extend(sampleFunc(filePath))
+    for fileSamples in mapFiles(sampleFunc, listDataFiles(folderPath), folderPath, jobs):
+        samples.extend(fileSamples)
     return samples
 
+def _summarizeFile(sampleFunc, filePath):
+    """Return an OnlineStats summary of the samples in one file, as a dict."""
+    with instrumentation.timed('extract.' + sampleFunc.__name__):
+        samples = sampleFunc(filePath)
+    with instrumentation.timed('stats.summarize'):
+        return OnlineStats.fromValues(samples, QUANTILE_SKETCH_K).toDict()
+
+def _mergeSummaries(fileSummaries):
+    """Merge per-file summary dicts in order and return the merged summary as a dict.
+    The dict also lists every file's [count, mean] under 'fileMeans' (for bootstrapping over simulations).
+    """
+    summary = OnlineStats(QUANTILE_SKETCH_K)
+    for fileSummary in fileSummaries:
+        summary.merge(OnlineStats.fromDict(fileSummary))
+    merged = summary.toDict()
+    merged['fileMeans'] = [[fileSummary['count'], fileSummary['mean']] for fileSummary in fileSummaries]
+    return merged
+
+def _strategySummary(folderPath, sampleFunc, jobs=None):
+    """Return the merged summary dict of a folder (see getStrategySummary())."""
+    settings = resultSettings(sampleFunc, sketchK=QUANTILE_SKETCH_K)
+    return folderResults(folderPath, settings, partial(_summarizeFile, sampleFunc), _mergeSummaries, jobs)
+
+def getStrategySummary(folderPath, sampleFunc, jobs=None):
+    """Summarize all samples for a strategy from all .txt files in a folder without keeping the samples in memory.
+    Each file is summarized separately (in parallel with jobs > 1) and the summaries are merged in file order.
+    File summaries and the merged summary are kept in the results store, so only new or changed files are read.
+    """
+    return OnlineStats.fromDict(_strategySummary(folderPath, sampleFunc, jobs))
+
 def marginOfError(samples, confidence=CONFIDENCE_LEVEL):
-    """Calculate the margin of error for a list of samples at the given confidence level (user-configurable)."""
+    """Calculate the margin of error for a list of samples (or an OnlineStats summary) at the given confidence level (user-configurable)."""
     n = len(samples)
     if n < 2:
         return 0.0
-    mean = np.mean(samples)
-    sem = scipy.stats.sem(samples)
-    h = sem * scipy.stats.t.ppf((1 + confidence) / 2, n - 1)
+    from scipy.special import stdtrit  # Student's t quantile (what scipy.stats.t.ppf uses), much faster to import
+    sem = samples.sem() if isinstance(samples, OnlineStats) else np.std(samples, ddof=1) / np.sqrt(n)
+    h = sem * stdtrit(n - 1, (1 + confidence) / 2)
     return h
 
-def main():
-    """Main function to run all analyses and plots for the experiment data."""
+TRAJECTORY_STAT_FUNCS = [extractPathLength, extractSpeed, extractMinSeparation, extractNearMisses]
+TRAJECTORY_Y_LABELS = ['Average Path Length', 'Average Speed (units/s)', 'Minimum Separation', 'Near Misses']
+
+def main(experiments=None):
+    """Main function to run all analyses and plots for the experiment data (all experiment types by default)."""
     if not os.path.isdir(ROOT_FOLDER):
-        print(f"Warning: root folder '{ROOT_FOLDER}' does not exist. Please update the path."); return
+        print(f"Warning: root folder '{ROOT_FOLDER}' does not exist. Please update the path or pass --root."); return
+    experiments = [experiment.lower() for experiment in (FOLDER_TYPES if experiments is None else experiments)]
     # Both Fixed
-    makespanSamplesDict, traversalSamplesDict, emdSamplesDict = {}, {}, {}
-    for strategy in STRATEGIES:
-        pathMakespan = os.path.join(ROOT_FOLDER, MAKESPAN_DIR, strategy, FOLDER_TYPES[0])
-        pathSpatial = os.path.join(ROOT_FOLDER, SPATIAL_DIR, strategy, FOLDER_TYPES[0])
-        if os.path.isdir(pathMakespan):
-            makespanSamples = getStrategySamples(pathMakespan, extractMakespanSamples)
-            traversalSamples = getStrategySamples(pathMakespan, extractTraversalSamples)
-            makespanSamplesDict[strategy] = makespanSamples
-            traversalSamplesDict[strategy] = traversalSamples
-        if os.path.isdir(pathSpatial):
-            emdSamples = getStrategySamples(pathSpatial, extractEmdSamples)
-            emdSamplesDict[strategy] = emdSamples
-    plotBox(makespanSamplesDict, TITLE_BARCHART_MAKESPAN_STRATEGY, 'Makespan (ms)')
-    plotBox(traversalSamplesDict, TITLE_BARCHART_TRAVERSAL_STRATEGY, 'Average Traversal Time (ms)')
-    plotBox(emdSamplesDict, TITLE_BARCHART_EMD_STRATEGY, 'Wasserstein EMD')
+    if FOLDER_TYPES[0].lower() in experiments:
+        makespanSamplesDict, traversalSamplesDict, emdSamplesDict = {}, {}, {}
+        for strategy in STRATEGIES:
+            pathMakespan = dataFolder(ROOT_FOLDER, MAKESPAN_DIR, strategy, FOLDER_TYPES[0])
+            pathSpatial = dataFolder(ROOT_FOLDER, SPATIAL_DIR, strategy, FOLDER_TYPES[0])
+            with instrumentation.timed('stage.' + FOLDER_TYPES[0]):
+                if os.path.isdir(pathMakespan):
+                    makespanSamplesDict[strategy] = getStrategySummary(pathMakespan, extractMakespanSamples)
+                    traversalSamplesDict[strategy] = getStrategySummary(pathMakespan, extractTraversalSamples)
+                if os.path.isdir(pathSpatial):
+                    emdSamplesDict[strategy] = getStrategySummary(pathSpatial, extractEmdSamples)
+        plotBox(makespanSamplesDict, TITLE_BARCHART_MAKESPAN_STRATEGY, 'Makespan (ms)')
+        plotBox(traversalSamplesDict, TITLE_BARCHART_TRAVERSAL_STRATEGY, 'Average Traversal Time (ms)')
+        plotBox(emdSamplesDict, TITLE_BARCHART_EMD_STRATEGY, 'Wasserstein EMD')
     # Angle Fixed
-    analyzeFixed(
-        FOLDER_TYPES[1], ROOT_FOLDER, STRATEGIES, 'droneCount',
-        [extractMakespan, extractTraversal],
-        [plotScatter, plotScatter, plotScatter],
-        [
-            TITLE_MAKESPAN_ANGLE_CENTRALIZED,
-            TITLE_TRAVERSAL_ANGLE_CENTRALIZED,
-            TITLE_EMD_ANGLE_CENTRALIZED
-        ],
-        'Drone Count',
-        ['Makespan (ms)', 'Average Traversal Time (ms)', 'Wasserstein EMD'],
-        xIntTicks=True
-    )
+    if FOLDER_TYPES[1].lower() in experiments:
+        analyzeFixed(
+            FOLDER_TYPES[1], ROOT_FOLDER, STRATEGIES, 'droneCount',
+            [extractMakespan, extractTraversal],
+            [plotScatter, plotScatter, plotScatter],
+            [
+                TITLE_MAKESPAN_ANGLE_CENTRALIZED,
+                TITLE_TRAVERSAL_ANGLE_CENTRALIZED,
+                TITLE_EMD_ANGLE_CENTRALIZED
+            ],
+            'Drone Count',
+            ['Makespan (ms)', 'Average Traversal Time (ms)', 'Wasserstein EMD'],
+            xIntTicks=True,
+            spatialStatFuncs=TRAJECTORY_STAT_FUNCS,
+            spatialTitles=[TITLE_PATHLENGTH_DRONECOUNT, TITLE_SPEED_DRONECOUNT, TITLE_SEPARATION_DRONECOUNT, TITLE_NEARMISS_DRONECOUNT],
+            spatialYLabels=TRAJECTORY_Y_LABELS
+        )
     # Count Fixed
-    analyzeFixed(
-        FOLDER_TYPES[2], ROOT_FOLDER, STRATEGIES, 'angle',
-        [extractMakespan, extractTraversal],
-        [plotScatter, plotScatter, plotScatter],
-        [
-            TITLE_MAKESPAN_ANGLE_DECENTRALIZED,
-            TITLE_TRAVERSAL_ANGLE_DECENTRALIZED,
-            TITLE_EMD_ANGLE_DECENTRALIZED
-        ],
-        'Angle (Degrees)',
-        ['Makespan (ms)', 'Average Traversal Time (ms)', 'Wasserstein EMD'],
-        xIntTicks=True
-    )
+    if FOLDER_TYPES[2].lower() in experiments:
+        analyzeFixed(
+            FOLDER_TYPES[2], ROOT_FOLDER, STRATEGIES, 'angle',
+            [extractMakespan, extractTraversal],
+            [plotScatter, plotScatter, plotScatter],
+            [
+                TITLE_MAKESPAN_ANGLE_DECENTRALIZED,
+                TITLE_TRAVERSAL_ANGLE_DECENTRALIZED,
+                TITLE_EMD_ANGLE_DECENTRALIZED
+            ],
+            'Angle (Degrees)',
+            ['Makespan (ms)', 'Average Traversal Time (ms)', 'Wasserstein EMD'],
+            xIntTicks=True,
+            spatialStatFuncs=TRAJECTORY_STAT_FUNCS,
+            spatialTitles=[TITLE_PATHLENGTH_ANGLE, TITLE_SPEED_ANGLE, TITLE_SEPARATION_ANGLE, TITLE_NEARMISS_ANGLE],
+            spatialYLabels=TRAJECTORY_Y_LABELS
+        )
+    if RENDER_FOLDER is not None:
+        with instrumentation.timed('stage.render'):
+            renderFigures()
+
+# --- Command Line ---
+
+# metric name -> (data folder, per-sample function or None, per-file function)
+STAT_METRICS = {
+    'makespan': (MAKESPAN_DIR, extractMakespanSamples, extractMakespan),
+    'traversal': (MAKESPAN_DIR, extractTraversalSamples, extractTraversal),
+    'emd': (SPATIAL_DIR, extractEmdSamples, extractEmd),
+    'pathLength': (SPATIAL_DIR, None, extractPathLength),
+    'speed': (SPATIAL_DIR, None, extractSpeed),
+    'minSeparation': (SPATIAL_DIR, None, extractMinSeparation),
+    'nearMisses': (SPATIAL_DIR, None, extractNearMisses)
+}
+
+def collectStats(rootFolder, strategies, experiments, metrics, bootstrapCI=False):
+    """Return one row of descriptive statistics per (experiment, strategy, metric).
+    BothFixed rows summarize every sample (e.g., every drone's exit time); the other experiments summarize the
+    per-file values and also list them as (x, value) points.
+    With bootstrapCI, rows also get a bootstrap interval of their Mean (meanLow, meanHigh), and rows with points get the
+    best-fit coefficients with their intervals (fit, fitLow, fitHigh), see addBootstrapIntervals().
+    """
+    rows, fileValues = [], []
+    for experiment in experiments:
+        for strategy in strategies:
+            for metric in metrics:
+                dataDir, sampleFunc, fileFunc = STAT_METRICS[metric]
+                folderPath = dataFolder(rootFolder, dataDir, strategy, experiment)
+                if not os.path.isdir(folderPath):
+                    continue
+                row = {'experiment': experiment, 'strategy': strategy, 'metric': metric,
+                       'files': len(listDataFiles(folderPath))}
+                if experiment.lower() == FOLDER_TYPES[0].lower() and sampleFunc is not None:
+                    summary = _strategySummary(folderPath, sampleFunc)
+                    samples = OnlineStats.fromDict(summary)
+                    # The Mean pools every sample, so each simulation's mean is weighted by its sample count
+                    fileValues.append(([mean for count, mean in summary['fileMeans'] if count],
+                                       [count for count, _ in summary['fileMeans'] if count]))
+                else:
+                    points = folderStats(folderPath, X_AXIS.get(experiment.lower(), 'droneCount'), fileFunc)
+                    row['points'] = [[float(x), float(value)] for x, value in sorted(points)]
+                    samples = [value for _, value in row['points']]
+                    fileValues.append((samples, [1] * len(samples)))
+                stats = describeSamples(samples) or {'Count': 0}
+                row.update({name: float(value) if name != 'Count' else int(value) for name, value in stats.items()})
+                row['marginOfError'] = float(marginOfError(samples))
+                rows.append(row)
+    if bootstrapCI:
+        addBootstrapIntervals(rows, fileValues)
+    return rows
+
+def addBootstrapIntervals(rows, fileValues):
+    """Add bootstrap intervals at CONFIDENCE_LEVEL to stats rows, resampling simulations (files).
+    fileValues holds one (values, weights) pair per row: one value per file, weighted by the samples it adds to the row's Mean.
+    Every row's resamples are drawn and evaluated together, and so are the best-fit lines of all rows with points.
+    """
+    with instrumentation.timed('stats.bootstrap'):
+        means = bootstrap.bootstrapIntervals([values for values, _ in fileValues], 'mean', BOOTSTRAP_RESAMPLES,
+                                             CONFIDENCE_LEVEL, BOOTSTRAP_SEED, weights=[weights for _, weights in fileValues])
+        fitted = [row for row in rows if 'points' in row]
+        fits = bootstrap.bootstrapFits([([x for x, _ in row['points']], [y for _, y in row['points']]) for row in fitted],
+                                       BEST_FIT_DEGREE, BOOTSTRAP_RESAMPLES, CONFIDENCE_LEVEL, BOOTSTRAP_SEED)
+    # Rows backed by a single file have no interval (None, written as null in JSON and left empty in CSV)
+    for i, row in enumerate(rows):
+        row['meanLow'], row['meanHigh'] = (float(means[name][i]) if np.isfinite(means[name][i]) else None for name in ('low', 'high'))
+    for i, row in enumerate(fitted):
+        row['fit'], row['fitLow'], row['fitHigh'] = (fits[name][i].tolist() for name in ('coefficients', 'coefficientLow', 'coefficientHigh'))
+
+def writeStats(rows, outputFormat, outputFile=None):
+    """Write stats rows as text, JSON or CSV to outputFile (stdout by default)."""
+    file = open(outputFile, 'w', newline='') if outputFile else sys.stdout
+    try:
+        if outputFormat == 'json':
+            json.dump({'root': ROOT_FOLDER, 'confidence': CONFIDENCE_LEVEL, 'rows': rows}, file, indent=2)
+            file.write('\n')
+        elif outputFormat == 'csv':
+            import csv
+            fields = ['experiment', 'strategy', 'metric', 'files', 'Count', 'Mean', 'Std', 'Min', '25%', 'Median', '75%', 'Max',
+                      'marginOfError', 'meanLow', 'meanHigh']
+            writer = csv.DictWriter(file, fieldnames=fields, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                print(f"\n=== {row['experiment']} / {row['strategy']} / {row['metric']} ({row['files']} files) ===", file=file)
+                for name in ['Count', 'Mean', 'Std', 'Min', '25%', 'Median', '75%', 'Max', 'marginOfError', 'meanLow', 'meanHigh']:
+                    if name in row:
+                        value = 'n/a' if row[name] is None else row[name]
+                        print(f"  {name:>13}: {value:>10.3f}" if isinstance(value, float) else f"  {name:>13}: {value:>10}", file=file)
+    finally:
+        if outputFile:
+            file.close()
+
+def runStats(args):
+    """stats: print descriptive statistics and margins of error without plotting."""
+    rows = collectStats(ROOT_FOLDER, args.strategy, args.experiment, args.metric, args.bootstrap)
+    writeStats(rows, args.output_format, args.output)
+
+def runPlot(args):
+    """plot: compute statistics and show the figures, or write them to --render FOLDER."""
+    global RENDER_FOLDER, FIGURE_FORMAT
+    RENDER_FOLDER, FIGURE_FORMAT = args.render, args.format
+    if RENDER_FOLDER is not None:
+        import matplotlib
+        matplotlib.use('Agg')
+    main(args.experiment)
+
+def runEmd(args):
+    """emd: print the mean EMD of every spatial file, or with --error the error of the EMD mode against the exact solver."""
+    for experiment in args.experiment:
+        for strategy in args.strategy:
+            folderPath = dataFolder(ROOT_FOLDER, SPATIAL_DIR, strategy, experiment)
+            if not os.path.isdir(folderPath):
+                continue
+            if args.error:
+                reportEmdError(folderPath)
+                continue
+            print(f"\n=== EMD ({EMD_MODE}): {experiment} / {strategy} ===")
+            filePaths = listDataFiles(folderPath)
+            for filePath, value in zip(filePaths, mapFiles(extractEmd, filePaths, folderPath)):
+                print(f"{os.path.basename(filePath)}: " + ('no frames' if value is None else f"{value:.4f}"))
+
+COMMANDS = {'stats': runStats, 'plot': runPlot, 'emd': runEmd}
+
+def parseArgs(argv=None):
+    """Parse command-line options. Without a subcommand, 'plot' is assumed."""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not any(arg in COMMANDS for arg in argv) and not any(arg in ('-h', '--help') for arg in argv):
+        argv = ['plot'] + argv
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--root', default=ROOT_FOLDER, help='data root containing Makespan/ and Spatial/ (default: %(default)s)')
+    common.add_argument('--strategy', nargs='+', default=STRATEGIES, help='strategies to analyze (default: %(default)s)')
+    common.add_argument('--experiment', nargs='+', default=FOLDER_TYPES, help='experiment types to analyze (default: %(default)s)')
+    common.add_argument('--jobs', '-j', type=int, default=JOBS,
+                        help='number of worker processes for per-file work (default: %(default)s, 1 = serial)')
+    common.add_argument('--count', metavar='MIN:MAX', type=partial(manifest.parseRange, convert=int),
+                        help='only files with a drone count in this range (e.g., 10:20, 10: or 15)')
+    common.add_argument('--angle', metavar='MIN:MAX', type=partial(manifest.parseRange, convert=float),
+                        help='only files with a maximum angle in this range')
+    common.add_argument('--time', metavar='MIN:MAX', type=partial(manifest.parseRange, convert=int),
+                        help='spatial metrics only use the frames in this time range (ms)')
+    common.add_argument('--emd-mode', choices=emdEngine.EMD_MODES, default=EMD_MODE, help='EMD solver (default: %(default)s)')
+    common.add_argument('--resamples', type=int, default=BOOTSTRAP_RESAMPLES,
+                        help='bootstrap resamples for intervals and confidence bands (default: %(default)s)')
+    common.add_argument('--instrument', metavar='REPORT',
+                        help='time and count every stage and write the report to REPORT (.json or .csv)')
+    common.add_argument('--cprofile', metavar='FILE',
+                        help='also profile the run with cProfile and dump the stats to FILE (main process only)')
+    parser = argparse.ArgumentParser(description='Compute and plot swarm experiment statistics.')
+    commands = parser.add_subparsers(dest='command')
+    stats = commands.add_parser('stats', parents=[common], help='print statistics without plotting')
+    stats.add_argument('--metric', nargs='+', choices=list(STAT_METRICS), default=['makespan', 'traversal'],
+                       help='metrics to summarize (default: %(default)s)')
+    stats.add_argument('--json', dest='output_format', action='store_const', const='json', default='text', help='write JSON')
+    stats.add_argument('--csv', dest='output_format', action='store_const', const='csv', help='write CSV')
+    stats.add_argument('--output', '-o', help='output file (default: stdout)')
+    stats.add_argument('--bootstrap', action='store_true',
+                       help='add bootstrap intervals of the mean and of the best-fit coefficients (resampling simulations)')
+    plot = commands.add_parser('plot', parents=[common], help='compute statistics and plot every figure (default)')
+    plot.add_argument('--render', metavar='FOLDER', default=RENDER_FOLDER,
+                      help='write figures to FOLDER without opening windows, redrawing only figures that changed')
+    plot.add_argument('--format', choices=['png', 'svg', 'pdf'], default=FIGURE_FORMAT,
+                      help='file format for --render (default: %(default)s)')
+    emd = commands.add_parser('emd', parents=[common], help='print per-file EMD values or solver error')
+    emd.add_argument('--error', action='store_true', help='report the error of --emd-mode against the exact solver')
+    return parser.parse_args(argv)
+
+def runCommand(args):
+    """Apply the global options and run the chosen subcommand, with instrumentation and profiling if requested."""
+    global ROOT_FOLDER, STRATEGIES, JOBS, EMD_MODE, BOOTSTRAP_RESAMPLES, DRONE_COUNT_RANGE, ANGLE_RANGE, TIME_RANGE
+    ROOT_FOLDER, STRATEGIES = args.root, args.strategy
+    DRONE_COUNT_RANGE, ANGLE_RANGE, TIME_RANGE = args.count, args.angle, args.time
+    _freshFolders.clear()
+    BOOTSTRAP_RESAMPLES = args.resamples
+    JOBS = max(1, args.jobs)
+    EMD_MODE = args.emd_mode
+    command = COMMANDS[args.command]
+    if not (args.instrument or args.cprofile):
+        command(args)
+        return
+    import cProfile
+    instrumentation.enable(bool(args.instrument))
+    profiler = cProfile.Profile() if args.cprofile else None
+    if profiler:
+        profiler.enable()
+    startTime = time.perf_counter()
+    try:
+        command(args)
+    finally:
+        if profiler:
+            profiler.disable()
+            profiler.dump_stats(args.cprofile)
+            print(f"cProfile stats written to {args.cprofile}", file=sys.stderr)
+        if args.instrument:
+            instrumentation.printSummary(file=sys.stderr)
+            instrumentation.writeReport(args.instrument, {
+                'command': args.command, 'wallSeconds': time.perf_counter() - startTime,
+                'jobs': JOBS, 'emdMode': EMD_MODE, 'root': ROOT_FOLDER})
+            print(f"Instrumentation report written to {args.instrument}", file=sys.stderr)
 
 if __name__ == "__main__":
-    main()
+    runCommand(parseArgs())
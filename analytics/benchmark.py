@@ -0,0 +1,134 @@
+# Analytics Benchmark
+# Times each stage of the analytics pipeline on a seeded synthetic dataset and writes the results as JSON
+
+import os
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import numpy as np
+import analytics
+import generateFakeData
+
+STRATEGIES = generateFakeData.production_strategies
+EXPERIMENT = 'AngleFixed'
+
+# --- Dataset Generation ---
+
+def writeSyntheticDataset(rootFolder, files, drones, frames, seed=0):
+    """Write a seeded dataset in the logger's layout: <Type>/<Strategy>/AngleFixed/Simulation-N.txt.
+    Each strategy gets `files` makespan and spatial logs with `drones` drones and `frames` spatial time steps.
+    """
+    index = 0
+    for strategy in STRATEGIES:
+        for simId in range(files):
+            rng = generateFakeData.file_rng(seed, index)
+            generateFakeData.write_production_simulation(rootFolder, strategy, EXPERIMENT, simId, drones, 35.0, frames, rng)
+            index += 1
+
+# --- Stages ---
+
+def timeStage(results, name, func, items):
+    """Run func, store its wall time and item count under results[name], and return its result.
+    items can also be a function of the result, for stages that discover their own item count.
+    """
+    startTime = time.perf_counter()
+    value = func()
+    seconds = time.perf_counter() - startTime
+    items = items(value) if callable(items) else items
+    results[name] = {'seconds': seconds, 'items': items, 'itemsPerSecond': items / seconds if seconds > 0 else None}
+    print(f"{name:>16}: {seconds:8.3f}s ({items} items)")
+    return value
+
+def discoverFiles(rootFolder):
+    """Return {'Makespan': [...], 'Spatial': [...]} lists of all .txt logs under the root folder."""
+    found = {'Makespan': [], 'Spatial': []}
+    for folder, _, fileNames in os.walk(rootFolder):
+        kind = os.path.relpath(folder, rootFolder).split(os.sep)[0]
+        if kind in found:
+            found[kind] += [os.path.join(folder, name) for name in sorted(fileNames) if name.endswith('.txt')]
+    return found
+
+def clearMemoryCaches():
+    """Drop in-memory caches so a stage measures the disk cache rather than earlier stages."""
+    analytics._loadMakespanColumns.cache_clear()
+    analytics._emdMemoryCache.clear()
+
+def runBenchmark(rootFolder, cacheFolder):
+    """Time every pipeline stage on the dataset in rootFolder and return the per-stage results."""
+    analytics.PARSE_CACHE_FOLDER = cacheFolder
+    shutil.rmtree(cacheFolder, ignore_errors=True)
+    clearMemoryCaches()
+    results = {}
+    found = timeStage(results, 'discovery', lambda: discoverFiles(rootFolder), lambda found: sum(map(len, found.values())))
+    makespanFiles, spatialFiles = found['Makespan'], found['Spatial']
+    allFiles = len(makespanFiles) + len(spatialFiles)
+    parseAll = lambda: ([analytics.loadMakespanFile(f) for f in makespanFiles], [analytics.loadSpatialFile(f) for f in spatialFiles])
+    timeStage(results, 'parse', parseAll, allFiles)
+    clearMemoryCaches()
+    timeStage(results, 'parseCached', parseAll, allFiles)
+    timeStage(results, 'makespanTraversal',
+              lambda: [(analytics.extractMakespan(f), analytics.extractTraversal(f)) for f in makespanFiles], len(makespanFiles))
+    frameCount = sum(len(np.unique(analytics.loadSpatialFile(f)['timeStamp'])) for f in spatialFiles)
+    emdValues = timeStage(results, 'emd', lambda: [analytics.emdSeries(f) for f in spatialFiles], frameCount)
+    analytics._emdMemoryCache.clear()
+    timeStage(results, 'emdCached', lambda: [analytics.emdSeries(f) for f in spatialFiles], frameCount)
+    def describeAll():
+        samples = [analytics.validExitTimes(analytics.loadMakespanFile(f)) for f in makespanFiles] + list(emdValues)
+        summary = analytics.OnlineStats(analytics.QUANTILE_SKETCH_K)
+        for values in samples:
+            summary.merge(analytics.OnlineStats.fromValues(values, analytics.QUANTILE_SKETCH_K))
+        return analytics.describeSamples(summary), analytics.marginOfError(summary)
+    timeStage(results, 'descriptiveStats', describeAll, allFiles)
+    return results
+
+def codeVersion():
+    """Return the git commit of the working tree (with a -dirty suffix for local changes), or None outside git."""
+    try:
+        folder = os.path.dirname(os.path.abspath(__file__))
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=folder, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--', '.'], cwd=folder, capture_output=True, text=True).stdout.strip()
+        return commit + ('-dirty' if dirty else '')
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the analytics pipeline on a seeded synthetic dataset.')
+    parser.add_argument('--files', type=int, default=20, help='simulations per strategy (default: %(default)s)')
+    parser.add_argument('--drones', type=int, default=50, help='drones per simulation (default: %(default)s)')
+    parser.add_argument('--frames', type=int, default=200, help='spatial time steps per simulation (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: %(default)s)')
+    parser.add_argument('--emd-mode', choices=analytics.emdEngine.EMD_MODES, default=analytics.EMD_MODE)
+    parser.add_argument('--data', help='dataset folder to reuse or create (default: a temporary folder)')
+    parser.add_argument('--output', '-o', default='benchmark.json', help='JSON results file (default: %(default)s)')
+    args = parser.parse_args()
+    analytics.EMD_MODE = args.emd_mode
+    workFolder = tempfile.mkdtemp(prefix='swarm-benchmark-')
+    rootFolder = args.data or os.path.join(workFolder, 'root')
+    try:
+        if not os.path.isdir(rootFolder):
+            print(f"Generating {args.files} x {len(STRATEGIES)} simulations ({args.drones} drones, {args.frames} frames)...")
+            startTime = time.perf_counter()
+            writeSyntheticDataset(rootFolder, args.files, args.drones, args.frames, args.seed)
+            print(f"Generated in {time.perf_counter() - startTime:.1f}s")
+        stages = runBenchmark(rootFolder, os.path.join(workFolder, 'cache'))
+    finally:
+        shutil.rmtree(workFolder, ignore_errors=True)
+    report = {
+        'version': codeVersion(),
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'config': {'files': args.files, 'drones': args.drones, 'frames': args.frames, 'seed': args.seed,
+                   'emdMode': args.emd_mode, 'data': args.data},
+        'environment': {'python': platform.python_version(), 'numpy': np.__version__, 'platform': platform.platform(),
+                        'cpus': os.cpu_count()},
+        'stages': stages
+    }
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+# Bootstrap
+# Batched bootstrap confidence intervals and best-fit confidence bands: every resample of every group comes from one index matrix, evaluated in chunks of bounded memory
+
+import numpy as np
+
+MAX_CHUNK_BYTES = 256 * 2 ** 20  # Upper bound on the working arrays of one chunk of resamples
+GRID_POINTS = 100  # Points along x at which fit bands are evaluated (as the best-fit line in scatter plots)
+
+# --- Resampling ---
+
+def padGroups(groups, padding=0.0):
+    """Return (table, sizes): the groups as rows of a float64 matrix, and each group's length.
+    Rows are filled up with padding, including one extra column that resampleIndices() points padding entries at.
+    """
+    groups = [np.asarray(group, dtype=np.float64).ravel() for group in groups]
+    sizes = np.array([len(group) for group in groups], dtype=np.int64)
+    table = np.full((len(groups), sizes.max(initial=0) + 1), padding)
+    for row, group in enumerate(groups):
+        table[row, :len(group)] = group
+    return table, sizes
+
+def chunkRanges(total, bytesPerItem, maxBytes=MAX_CHUNK_BYTES):
+    """Yield (start, stop) ranges of items (e.g., resamples) whose working arrays stay under maxBytes."""
+    step = max(1, int(maxBytes // max(1, bytesPerItem)))
+    for start in range(0, total, step):
+        yield start, min(total, start + step)
+
+def resampleIndices(rng, sizes, count):
+    """Return a (count, groups, max size) index matrix: each resample of group g draws sizes[g] indices below sizes[g]
+    with replacement, and the remaining columns point at the padding column of padGroups().
+    Indices are scaled from 32-bit draws (bias below size / 2**32). Draws are made resample by resample, so splitting
+    resamples into chunks gives the same indices as drawing them all at once.
+    """
+    width = int(sizes.max(initial=0))
+    draws = rng.integers(0, 2 ** 32, size=(count, len(sizes), width), dtype=np.uint32)
+    indices = draws.astype(np.int64)
+    indices *= sizes[:, None]
+    indices >>= 32
+    padding = np.arange(width) >= sizes[:, None]
+    if padding.any():
+        indices[:, padding] = width
+    return indices
+
+def _percentiles(values, confidence, axis=0):
+    """Return the (low, high) percentile interval along an axis (resamples) at the given confidence level."""
+    alpha = (1 - confidence) / 2
+    low, high = np.percentile(values, [100 * alpha, 100 * (1 - alpha)], axis=axis)
+    return low, high
+
+# --- Intervals ---
+
+def _mean(values, sizes):
+    return values.sum(axis=-1) / sizes
+
+def _std(values, sizes):
+    # Values are centered on the group mean, so the sums do not cancel
+    mean = values.sum(axis=-1) / sizes
+    squares = np.einsum('...i,...i->...', values, values)
+    return np.sqrt(np.maximum(squares - sizes * mean ** 2, 0) / np.maximum(sizes - 1, 1))
+
+def _median(values, sizes):
+    ordered = np.sort(values, axis=-1)
+    low = np.take_along_axis(ordered, np.broadcast_to(((sizes - 1) // 2)[:, None], ordered.shape[:-1] + (1,)), axis=-1)
+    high = np.take_along_axis(ordered, np.broadcast_to((sizes // 2)[:, None], ordered.shape[:-1] + (1,)), axis=-1)
+    return (low[..., 0] + high[..., 0]) / 2
+
+# name -> (padding value, reduction over the last axis of centered values, whether the group mean is added back)
+STATISTICS = {
+    'mean': (0.0, _mean, True),
+    'median': (np.inf, _median, True),
+    'std': (0.0, _std, False)
+}
+
+def bootstrapIntervals(groups, statistic='mean', resamples=2000, confidence=0.95, seed=0, maxBytes=MAX_CHUNK_BYTES, weights=None):
+    """Return percentile bootstrap intervals of a statistic ('mean', 'median' or 'std') for every group of samples.
+    All groups are resampled together: each chunk of resamples is one (resamples, groups, samples) array reduced in
+    a single call. Returns {'estimate', 'low', 'high'} arrays with one entry per group. Groups with fewer than two
+    samples (of positive weight) have nothing to resample, so all three are NaN for them.
+    weights (one array per group, mean only) gives a weighted mean, resampled together with the values. With
+    per-simulation means weighted by their sample counts, this is the bootstrap of the pooled mean over simulations.
+    """
+    if weights is not None and statistic != 'mean':
+        raise ValueError("weights are only supported for the mean")
+    padding, reduce, location = STATISTICS[statistic]
+    groups = [np.asarray(group, dtype=np.float64).ravel() for group in groups]
+    weights = [np.ones(len(group)) for group in groups] if weights is None else [np.asarray(w, dtype=np.float64).ravel() for w in weights]
+    estimate, low, high = (np.full(len(groups), np.nan) for _ in range(3))
+    active = np.array([np.count_nonzero(weight > 0) >= 2 for weight in weights], dtype=bool)
+    if not active.any():
+        return {'estimate': estimate, 'low': low, 'high': high}
+    groups, weights = [g for g, a in zip(groups, active) if a], [w for w, a in zip(weights, active) if a]
+    weighted = any((weight != 1).any() for weight in weights)
+    center = np.array([np.average(group, weights=weight) for group, weight in zip(groups, weights)])
+    table, sizes = padGroups([group - offset for group, offset in zip(groups, center)], padding)
+    weightTable, _ = padGroups(weights)
+    def evaluate(indices):
+        values = np.take_along_axis(table[None] if indices.ndim == 3 else table, indices, axis=-1)
+        if not weighted:
+            return reduce(values, sizes)
+        resampledWeights = np.take_along_axis(weightTable[None] if indices.ndim == 3 else weightTable, indices, axis=-1)
+        return np.einsum('...i,...i->...', resampledWeights, values) / resampledWeights.sum(axis=-1)
+    rng = np.random.default_rng(seed)
+    stats = np.empty((resamples, len(sizes)))
+    # Per resample and sample: a 32-bit draw, a 64-bit index, the resampled value and weight, plus the reduction's temporaries
+    for start, stop in chunkRanges(resamples, table.size * 40, maxBytes):
+        stats[start:stop] = evaluate(resampleIndices(rng, sizes, stop - start))
+    shift = center if location else 0.0
+    estimate[active] = evaluate(np.broadcast_to(np.arange(table.shape[1] - 1), table[:, :-1].shape)) + shift
+    low[active], high[active] = _percentiles(stats, confidence)
+    low[active] += shift
+    high[active] += shift
+    return {'estimate': estimate, 'low': low, 'high': high}
+
+# --- Polynomial Fits ---
+
+def _solveFits(xs, ys, sizes, degree):
+    """Least-squares polynomial fits for a stack of point sets (..., groups, n), highest degree first.
+    Padding entries must have x = y = 0, so only sizes real points enter the sums. x should be scaled to about [-1, 1]
+    so the normal equations stay well conditioned. Singular sets (e.g., a single distinct x) get a least-norm fit.
+    """
+    terms = degree + 1
+    powerSums = np.empty(xs.shape[:-1] + (2 * degree + 1,))
+    crossSums = np.empty(xs.shape[:-1] + (terms,))
+    power = np.ones_like(xs)
+    for k in range(2 * degree + 1):
+        powerSums[..., k] = power.sum(axis=-1) if k else sizes
+        if k < terms:
+            crossSums[..., k] = np.einsum('...i,...i->...', power, ys)
+        power = power * xs
+    exponents = 2 * degree - np.add.outer(np.arange(terms), np.arange(terms))
+    normal = powerSums[..., exponents]
+    normal += np.eye(terms) * 1e-12 * np.trace(normal, axis1=-2, axis2=-1)[..., None, None]
+    return np.linalg.solve(normal, crossSums[..., ::-1, None])[..., 0]
+
+def _unscale(coefficients, center, halfRange):
+    """Convert coefficients of p((x - center) / halfRange), highest degree first, to coefficients of p(x) per group."""
+    terms = coefficients.shape[-1]
+    conversion = np.zeros((len(center), terms, terms))
+    for group, (offset, scale) in enumerate(zip(center, halfRange)):
+        for k in range(terms):
+            conversion[group, :k + 1, k] = np.polynomial.polynomial.polypow([-offset / scale, 1 / scale], k)
+    conversion = conversion[:, ::-1, ::-1]  # lowest degree first -> highest degree first
+    return np.einsum('gij,...gj->...gi', conversion, coefficients)
+
+def bootstrapFits(groups, degree=1, resamples=2000, confidence=0.95, seed=0, gridPoints=GRID_POINTS, maxBytes=MAX_CHUNK_BYTES):
+    """Fit a polynomial to each group of (x, y) points and bootstrap its uncertainty.
+    Points are resampled in (x, y) pairs, and every resample of every group is fitted in one batched solve per chunk.
+    Returns arrays with one row per group (NaN for groups with too few points to fit):
+      coefficients, coefficientLow, coefficientHigh  (groups, degree + 1), highest degree first like np.polyfit
+      gridX, fit, bandLow, bandHigh                  (groups, gridPoints) pointwise confidence band of the fitted curve
+    """
+    terms, count = degree + 1, len(groups)
+    result = {name: np.full((count, terms), np.nan) for name in ('coefficients', 'coefficientLow', 'coefficientHigh')}
+    result.update({name: np.full((count, gridPoints), np.nan) for name in ('gridX', 'fit', 'bandLow', 'bandHigh')})
+    points = [(np.asarray(x, dtype=np.float64).ravel(), np.asarray(y, dtype=np.float64).ravel()) for x, y in groups]
+    active = np.array([len(x) > degree for x, _ in points], dtype=bool)
+    if not active.any():
+        return result
+    points = [point for point, isActive in zip(points, active) if isActive]
+    # Scale x to [-1, 1] per group for conditioning; padding stays at x = y = 0
+    lowX, highX = np.array([x.min() for x, _ in points]), np.array([x.max() for x, _ in points])
+    center, halfRange = (lowX + highX) / 2, np.where(highX > lowX, (highX - lowX) / 2, 1.0)
+    xTable, sizes = padGroups([(x - offset) / scale for (x, _), offset, scale in zip(points, center, halfRange)])
+    yTable, _ = padGroups([y for _, y in points])
+    gridScaled = np.linspace(np.where(highX > lowX, -1.0, 0.0), np.where(highX > lowX, 1.0, 0.0), gridPoints, axis=1)
+    gridPowers = gridScaled[..., None] ** np.arange(degree, -1, -1)
+    rng = np.random.default_rng(seed)
+    coefficients = np.empty((resamples, len(sizes), terms))
+    # Per resample and point: a 32-bit draw, a 64-bit index, resampled x and y, and the running power of x
+    for start, stop in chunkRanges(resamples, xTable.size * 48, maxBytes):
+        indices = resampleIndices(rng, sizes, stop - start)
+        coefficients[start:stop] = _solveFits(np.take_along_axis(xTable[None], indices, axis=2),
+                                              np.take_along_axis(yTable[None], indices, axis=2), sizes, degree)
+    fitted = _solveFits(xTable[:, :-1], yTable[:, :-1], sizes, degree)
+    bandLow, bandHigh = np.empty((len(sizes), gridPoints)), np.empty((len(sizes), gridPoints))
+    # Band: every resample's curve on the grid, a few groups at a time (the curves and the percentile's sorted copy)
+    for start, stop in chunkRanges(len(sizes), resamples * gridPoints * 16, maxBytes):
+        curves = gridPowers[start:stop] @ coefficients[:, start:stop].transpose(1, 2, 0)  # (groups, grid, resamples)
+        bandLow[start:stop], bandHigh[start:stop] = _percentiles(curves, confidence, axis=-1)
+    result['coefficients'][active] = _unscale(fitted, center, halfRange)
+    low, high = _percentiles(_unscale(coefficients, center, halfRange), confidence)
+    result['coefficientLow'][active], result['coefficientHigh'][active] = low, high
+    result['gridX'][active] = center[:, None] + gridScaled * halfRange[:, None]
+    result['fit'][active] = np.einsum('gt,gpt->gp', fitted, gridPowers)
+    result['bandLow'][active], result['bandHigh'][active] = bandLow, bandHigh
+    return result
@@ -0,0 +1,237 @@
+# EMD Engine
+# Exact and approximate Wasserstein EMD solvers between 2D point sets, used by analytics.py
+
+import time
+import numpy as np
+import instrumentation
+
+EMD_MODES = ['exact', 'sliced', 'sinkhorn']
+EXACT_UNEQUAL_MODES = ['matching', 'transport']  # How exactEmd compares frames with different numbers of points
+EMD_VERSION = 3  # Bump when a solver's definition changes so memoized EMD series and stored results are recomputed
+SINKHORN_MAX_BYTES = 256 * 2 ** 20  # Upper bound on the (frames, n, m) arrays of one Sinkhorn batch
+SINKHORN_BYTES_PER_CELL = 48  # Cost, kernel and plan plus temporaries, float64, per cell of a (frames, n, m) batch
+TRANSPORT_NEIGHBORS = 5  # Cheapest partners per point in the first sparse transport LP of exactEmd (more cost more per solve, fewer rounds)
+
+# --- Solvers ---
+
+def _northwestCorner(n, m):
+    """Return (rows, columns) of the northwest-corner plan between n and m equal masses: a feasible plan with n + m - 1 cells."""
+    rows, columns, i, j = [], [], 0, 0
+    while i < n and j < m:
+        rows.append(i)
+        columns.append(j)
+        # Row i holds m units and column j holds n units (masses scaled by n * m); move past whichever runs out first
+        rowEnd, columnEnd = (i + 1) * m, (j + 1) * n
+        i, j = i + (rowEnd <= columnEnd), j + (columnEnd <= rowEnd)
+    return np.array(rows), np.array(columns)
+
+def _sparseTransport(costMatrix, neighbors=TRANSPORT_NEIGHBORS, maxRounds=50):
+    """Optimal transport cost between equal masses on the rows and on the columns of costMatrix.
+    The linear program is solved on a sparse set of cells (each point's cheapest partners plus a feasible plan);
+    cells whose reduced cost under the LP's dual prices is negative are added until there are none, which proves
+    the sparse optimum is optimal over all n * m cells. Returns None if the LP fails.
+    """
+    from scipy.optimize import linprog
+    from scipy.sparse import csr_matrix, vstack
+    n, m = costMatrix.shape
+    k = min(neighbors, n, m)
+    rows, columns = _northwestCorner(n, m)
+    nearColumns = np.argpartition(costMatrix, k - 1, axis=1)[:, :k]
+    nearRows = np.argpartition(costMatrix, k - 1, axis=0)[:k]
+    cells = np.unique(np.concatenate([rows * m + columns, np.repeat(np.arange(n), k) * m + nearColumns.ravel(),
+                                      nearRows.ravel() * m + np.tile(np.arange(m), k)]))
+    supplies = np.concatenate([np.full(n, 1.0 / n), np.full(m, 1.0 / m)])
+    tolerance = 1e-9 * max(costMatrix.max(), np.finfo(float).tiny)
+    for _ in range(maxRounds):
+        rows, columns = np.divmod(cells, m)
+        ones = np.ones(len(cells))
+        constraints = vstack([csr_matrix((ones, (rows, np.arange(len(cells)))), shape=(n, len(cells))),
+                              csr_matrix((ones, (columns, np.arange(len(cells)))), shape=(m, len(cells)))]).tocsr()
+        result = linprog(costMatrix.ravel()[cells], A_eq=constraints, b_eq=supplies, bounds=(0, None), method='highs')
+        if result.status != 0:
+            return None
+        duals = result.eqlin.marginals
+        reduced = costMatrix - duals[:n, None] - duals[None, n:]
+        worstColumns = reduced.argmin(axis=1)
+        violating = np.flatnonzero(reduced[np.arange(n), worstColumns] < -tolerance)
+        if not violating.size:
+            return float(result.fun)
+        cells = np.union1d(cells, violating * m + worstColumns[violating])
+    return None
+
+def exactEmd(positionsA, positionsB, unequal='matching'):
+    """Exact EMD: mean cost of the optimal one-to-one assignment between the two point sets (O(n^3)).
+    When their sizes differ, unequal picks the definition: 'matching' (the default) matches every point of the
+    smaller set to a distinct point of the larger one and leaves the rest out, as the assignment always has;
+    'transport' gives every point equal mass and splits it between partners, as the sliced and Sinkhorn modes do
+    (an exact but much slower linear program, see _sparseTransport()).
+    """
+    # scipy is only loaded when the exact solver is used
+    from scipy.spatial.distance import cdist
+    if not positionsA.size or not positionsB.size:
+        return None
+    costMatrix = cdist(positionsA, positionsB)
+    n, m = costMatrix.shape
+    if n != m and unequal == 'transport':
+        return _sparseTransport(costMatrix)
+    from scipy.optimize import linear_sum_assignment
+    rowInd, colInd = linear_sum_assignment(costMatrix)
+    return costMatrix[rowInd, colInd].mean()
+
+def _projectionDirections(projections):
+    """Return evenly spaced unit directions over the half circle, shape (2, projections)."""
+    angles = np.arange(projections) * (np.pi / projections)
+    return np.stack([np.cos(angles), np.sin(angles)])
+
+def _wasserstein1D(sortedA, sortedB):
+    """Exact 1D Wasserstein-1 distance between the columns of two sorted sample matrices (n, k) and (m, k)."""
+    n, m = len(sortedA), len(sortedB)
+    if n == m:
+        return np.abs(sortedA - sortedB).mean(axis=0)
+    # Compare the two quantile functions on the union of their breakpoints
+    levels = np.union1d(np.arange(1, n + 1) / n, np.arange(1, m + 1) / m)
+    widths = np.diff(levels, prepend=0.0)
+    midpoints = levels - widths / 2
+    quantilesA = sortedA[np.minimum((midpoints * n).astype(np.int64), n - 1)]
+    quantilesB = sortedB[np.minimum((midpoints * m).astype(np.int64), m - 1)]
+    return (widths[:, None] * np.abs(quantilesA - quantilesB)).sum(axis=0)
+
+def slicedEmd(positionsA, positionsB, projections=50):
+    """Sliced EMD: average of exact 1D Wasserstein distances over evenly spaced projection directions.
+    Scaled by pi/2 so that it matches the 2D EMD for a single pair of points (O(k n log n)).
+    """
+    if not positionsA.size or not positionsB.size:
+        return None
+    directions = _projectionDirections(projections)
+    projectedA = np.sort(positionsA @ directions, axis=0)
+    projectedB = np.sort(positionsB @ directions, axis=0)
+    return _wasserstein1D(projectedA, projectedB).mean() * (np.pi / 2)
+
+def sinkhornBatches(sizes, referenceSize, batchFrames=64, maxBytes=SINKHORN_MAX_BYTES):
+    """Yield lists of indices into sizes: consecutive frames solved together, at most batchFrames of them and with
+    padded (frames, n, m) arrays under maxBytes (a frame too large for maxBytes on its own is solved alone).
+    """
+    batch, largest = [], 0
+    for i, size in enumerate(sizes):
+        grown = max(largest, size)
+        if batch and (len(batch) == batchFrames or (len(batch) + 1) * grown * referenceSize * SINKHORN_BYTES_PER_CELL > maxBytes):
+            yield batch
+            batch, grown = [], size
+        batch.append(i)
+        largest = grown
+    if batch:
+        yield batch
+
+def sinkhornEmdBatch(framesList, reference, epsilon=0.01, iterations=200, batchFrames=64, tolerance=1e-6, maxBytes=SINKHORN_MAX_BYTES):
+    """Entropic (Sinkhorn) EMD between every frame and a reference point set.
+    Frames are padded to a common size and solved together with batched matrix products, in batches of at most
+    batchFrames frames whose arrays stay under maxBytes (see sinkhornBatches()).
+    epsilon is the regularization relative to the mean cost of each frame. Empty frames return NaN.
+    """
+    values = np.full(len(framesList), np.nan)
+    if not reference.size:
+        return values
+    b = np.full(len(reference), 1.0 / len(reference))
+    nonEmpty = [i for i, frame in enumerate(framesList) if frame.size]
+    for rows in sinkhornBatches([len(framesList[i]) for i in nonEmpty], len(reference), batchFrames, maxBytes):
+        batch = [nonEmpty[row] for row in rows]
+        sizes = np.array([len(framesList[i]) for i in batch])
+        padded = np.zeros((len(batch), sizes.max(), 2))
+        a = np.zeros((len(batch), sizes.max()))
+        for row, i in enumerate(batch):
+            padded[row, :sizes[row]] = framesList[i]
+            a[row, :sizes[row]] = 1.0 / sizes[row]
+        # Distances one coordinate at a time, so no (frames, n, m, 2) array is built
+        cost = np.square(padded[:, :, None, 0] - reference[None, None, :, 0])
+        cost += np.square(padded[:, :, None, 1] - reference[None, None, :, 1])
+        np.sqrt(cost, out=cost)
+        meanCost = (cost * (a > 0)[:, :, None]).sum(axis=(1, 2)) / (sizes * len(reference))
+        eps = (epsilon * np.maximum(meanCost, np.finfo(float).tiny))[:, None, None]
+        # Scaling form u * K * v; potentials f, g absorb large scalings to keep K representable
+        f = np.zeros(a.shape)
+        g = np.zeros((len(batch), len(reference)))
+        kernel = np.exp(-cost / eps) * (a > 0)[:, :, None]
+        u, v = np.ones(a.shape), np.ones(g.shape)
+        for iteration in range(iterations):
+            u = np.divide(a, (kernel @ v[:, :, None])[:, :, 0], out=np.zeros(a.shape), where=a > 0)
+            v = b / np.maximum((u[:, None, :] @ kernel)[:, 0, :], np.finfo(float).tiny)
+            if max(u.max(), v.max()) > 1e50:
+                f += eps[:, :, 0] * np.log(np.where(a > 0, u, 1.0))
+                g += eps[:, :, 0] * np.log(v)
+                kernel = np.exp((f[:, :, None] + g[:, None, :] - cost) / eps) * (a > 0)[:, :, None]
+                u, v = np.ones(a.shape), np.ones(g.shape)
+            elif iteration % 10 == 9:
+                rowMass = (kernel @ v[:, :, None])[:, :, 0] * u
+                if np.abs(rowMass - a).sum(axis=1).max() < tolerance:
+                    break
+        plan = u[:, :, None] * kernel * v[:, None, :]
+        values[batch] = (plan * cost).sum(axis=(1, 2))
+    return values
+
+# --- Engine ---
+
+def frameEmds(framesList, reference, mode='exact', projections=50, epsilon=0.01, iterations=200, batchFrames=64, maxBytes=SINKHORN_MAX_BYTES,
+              unequal='matching'):
+    """Return the EMD of every frame against the reference using the given mode. Empty frames are skipped."""
+    if mode not in EMD_MODES:
+        raise ValueError(f"Unknown EMD mode '{mode}', expected one of {EMD_MODES}")
+    if unequal not in EXACT_UNEQUAL_MODES:
+        raise ValueError(f"Unknown exact mode for unequal sizes '{unequal}', expected one of {EXACT_UNEQUAL_MODES}")
+    if instrumentation.ENABLED:
+        instrumentation.count('emd.framesSolved', len(framesList))
+        for frame in framesList:
+            instrumentation.count('emd.costMatrixCells', len(frame) * len(reference))
+            instrumentation.observe('emd.largestFrame', len(frame))
+    with instrumentation.timed('emd.solver.' + mode):
+        if mode == 'exact':
+            values = [exactEmd(frame, reference, unequal) for frame in framesList]
+        elif mode == 'sliced':
+            values = [slicedEmd(frame, reference, projections) for frame in framesList]
+        else:
+            values = sinkhornEmdBatch(framesList, reference, epsilon, iterations, batchFrames, maxBytes=maxBytes).tolist()
+    return [value for value in values if value is not None and not np.isnan(value)]
+
+def streamFrameEmds(framesIter, reference, mode='exact', projections=50, epsilon=0.01, iterations=200, batchFrames=64, maxBytes=SINKHORN_MAX_BYTES,
+                    unequal='matching'):
+    """Yield the EMD of each frame from an iterable as frames arrive. Sinkhorn buffers at most batchFrames frames."""
+    if mode == 'sinkhorn':
+        batch = []
+        for frame in framesIter:
+            batch.append(frame)
+            if len(batch) == batchFrames:
+                yield from frameEmds(batch, reference, mode, projections, epsilon, iterations, batchFrames, maxBytes, unequal)
+                batch = []
+        yield from frameEmds(batch, reference, mode, projections, epsilon, iterations, batchFrames, maxBytes, unequal)
+        return
+    for frame in framesIter:
+        yield from frameEmds([frame], reference, mode, projections, epsilon, iterations, batchFrames, maxBytes, unequal)
+
+def compareToExact(framesList, reference, mode, **options):
+    """Return the error of an approximate mode against the exact solver over the given frames.
+    options['unequal'] (default 'matching') sets how the exact solver treats frames of a different size than the reference.
+    """
+    startTime = time.perf_counter()
+    exact = [exactEmd(frame, reference, options.get('unequal', 'matching')) for frame in framesList]
+    exactTime = time.perf_counter() - startTime
+    # Frames the exact solver skipped (empty) or could not solve are left out of the comparison
+    solved = [frame for frame, value in zip(framesList, exact) if value is not None]
+    exact = np.array([value for value in exact if value is not None], dtype=np.float64)
+    startTime = time.perf_counter()
+    if mode == 'sinkhorn':
+        sinkhornOptions = {name: value for name, value in options.items() if name not in ('projections', 'unequal')}
+        approx = sinkhornEmdBatch(solved, reference, **sinkhornOptions)  # NaN where a frame fails, so rows stay aligned
+    else:
+        approx = np.array([(frameEmds([frame], reference, mode, **options) or [np.nan])[0] for frame in solved], dtype=np.float64)
+    approxTime = time.perf_counter() - startTime
+    absError = np.abs(approx - exact)
+    relError = absError / np.where(exact > 0, exact, np.nan)
+    compared = np.isfinite(absError).any()
+    return {
+        'mode': mode,
+        'frames': len(exact),
+        'meanAbsError': float(np.nanmean(absError)) if compared else 0.0,
+        'maxAbsError': float(np.nanmax(absError)) if compared else 0.0,
+        'meanRelError': float(np.nanmean(relError)) if np.isfinite(relError).any() else 0.0,
+        'exactSeconds': exactTime,
+        'approxSeconds': approxTime
+    }
@@ -1,26 +1,136 @@
 import subprocess
 import os
-import time
+import re
+import shutil
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 GODOT_PATH = "cluttered-navigation/godot.exe"
 PROJECT_PATH = "cluttered-navigation"
 SIMULATIONS = 15
 DRONE_COUNTS = range(2, 2 + SIMULATIONS)
-DRONE_DATA_FILE = "cluttered-navigation/drones-data.txt"
 
-def run_sim(drone_count, sim_id):
-    print(f"Running simulation {sim_id+1}/{SIMULATIONS} with {drone_count} drones...")
-    env = {**os.environ, "DRONE_COUNT": str(drone_count)}
-    cmd = [GODOT_PATH, "--headless", "--path", PROJECT_PATH, "--quit", "--", f"--drone-count={drone_count}", f"--sim-id={sim_id}"]
-    subprocess.run(cmd, env=env)
-    time.sleep(0.5)
+# Batch runner settings
+OUTPUT_ROOT = os.path.join(PROJECT_PATH, "output-data", "root")  # merged Makespan/ and Spatial/ trees
+RUNS_DIR = os.path.join(PROJECT_PATH, "output-data", "runs")     # isolated per-run output directories
+PARALLEL_RUNS = max(1, (os.cpu_count() or 2) // 2)               # simulations running at once
+RUN_TIMEOUT_SEC = 600                                            # a run taking longer than this is killed
+MAX_RETRIES = 2                                                  # extra attempts for a failed or timed-out run
+
+LOG_NAME = re.compile(r"Simulation-\d+\.txt$")
+SIM_ID = re.compile(r"Simulation-(\d+)\.(?:txt|bin)$")
+
+def next_sim_id(output_root=None, runs_dir=None):
+    """Return the first sim_id above every Simulation-N.txt under output_root and every sim-N folder left in runs_dir."""
+    output_root = OUTPUT_ROOT if output_root is None else output_root
+    runs_dir = RUNS_DIR if runs_dir is None else runs_dir
+    ids = [-1]
+    for folder, _, file_names in os.walk(output_root):
+        ids += [int(match.group(1)) for match in map(SIM_ID.match, file_names) if match]
+    if os.path.isdir(runs_dir):
+        ids += [int(name[4:]) for name in os.listdir(runs_dir) if name.startswith("sim-") and name[4:].isdigit()]
+    return max(ids) + 1
+
+def make_job(drone_count, sim_id, **params):
+    """Describe one headless run. Extra params are passed to the simulation as --key=value user args."""
+    return {"drone_count": drone_count, "sim_id": sim_id, "params": params}
+
+def run_dir_for(job):
+    return os.path.join(RUNS_DIR, f"sim-{job['sim_id']}")
+
+def run_sim(job, timeout=RUN_TIMEOUT_SEC):
+    """Run one simulation into its own output directory. Returns True if Godot exited cleanly and wrote logs."""
+    drone_count, sim_id = job["drone_count"], job["sim_id"]
+    run_dir = run_dir_for(job)
+    shutil.rmtree(run_dir, ignore_errors=True)
+    os.makedirs(run_dir)
+    # The simulation runner quits by itself once the run has logged its data (see SimulationRunner.gd)
+    cmd = [GODOT_PATH, "--headless", "--path", PROJECT_PATH, "--",
+           f"--drone-count={drone_count}", f"--sim-id={sim_id}", f"--output-dir={os.path.abspath(run_dir)}"]
+    cmd += [f"--{key.replace('_', '-')}={value}" for key, value in job["params"].items()]
+    with open(os.path.join(run_dir, "godot.log"), "w") as log:
+        try:
+            result = subprocess.run(cmd, stdout=log, stderr=subprocess.STDOUT, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            print(f"Simulation {sim_id} ({drone_count} drones) timed out after {timeout}s")
+            return False
+        except OSError as error:  # e.g., GODOT_PATH does not exist or is not executable
+            print(f"Simulation {sim_id} ({drone_count} drones) could not start: {error}")
+            return False
+    if result.returncode != 0:
+        print(f"Simulation {sim_id} ({drone_count} drones) exited with code {result.returncode}")
+        return False
+    return bool(find_logs(run_dir))
+
+def find_logs(run_dir):
+    """Return the relative paths of the Simulation-N.txt logs written into a run directory."""
+    logs = []
+    for folder, _, file_names in os.walk(run_dir):
+        logs += [os.path.relpath(os.path.join(folder, name), run_dir) for name in file_names if LOG_NAME.match(name)]
+    return sorted(logs)
+
+def merge_run(job):
+    """Move a finished run's logs into OUTPUT_ROOT/<Type>/<Strategy>/<Experiment>/Simulation-<sim_id>.txt.
+    Existing logs are never replaced: if any target exists, nothing is moved and the run is left in its folder.
+    """
+    run_dir = run_dir_for(job)
+    logs = find_logs(run_dir)
+    folders = [os.path.dirname(log) for log in logs]
+    if len(set(folders)) != len(folders):
+        print(f"Simulation {job['sim_id']} wrote several logs to one folder; leaving them in {run_dir}")
+        return False
+    targets = [os.path.join(OUTPUT_ROOT, folder, f"Simulation-{job['sim_id']}.txt") for folder in folders]
+    existing = [target for target in targets if os.path.exists(target)]
+    if existing:
+        print(f"Simulation {job['sim_id']} would overwrite {existing[0]}; leaving its logs in {run_dir}")
+        return False
+    for log, target in zip(logs, targets):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(os.path.join(run_dir, log), target)
+    return True
+
+def run_batch(jobs, parallel=PARALLEL_RUNS, timeout=RUN_TIMEOUT_SEC, retries=MAX_RETRIES):
+    """Run simulations in parallel, largest drone counts first, retrying failures.
+    Each finished run is merged into OUTPUT_ROOT (a run that cannot be merged is kept, not retried).
+    Returns the jobs that succeeded, in sim_id order.
+    """
+    pending = sorted(jobs, key=lambda job: job["drone_count"], reverse=True)
+    attempts = {job["sim_id"]: 0 for job in jobs}
+    succeeded, done = [], 0
+    with ThreadPoolExecutor(max_workers=parallel) as executor:
+        futures = {executor.submit(run_sim, job, timeout): job for job in pending}
+        while futures:
+            future = next(as_completed(futures))
+            job = futures.pop(future)
+            attempts[job["sim_id"]] += 1
+            finished = future.result()
+            if finished and merge_run(job):
+                done += 1
+                succeeded.append(job)
+                print(f"Finished simulation {job['sim_id']} with {job['drone_count']} drones ({done}/{len(jobs)})")
+            elif finished:
+                continue
+            elif attempts[job["sim_id"]] <= retries:
+                print(f"Retrying simulation {job['sim_id']} (attempt {attempts[job['sim_id']] + 1}/{retries + 1})")
+                futures[executor.submit(run_sim, job, timeout)] = job
+            else:
+                print(f"Giving up on simulation {job['sim_id']}; output kept in {run_dir_for(job)}")
+    return sorted(succeeded, key=lambda job: job["sim_id"])
 
 def main():
-    if os.path.exists(DRONE_DATA_FILE):
-        os.remove(DRONE_DATA_FILE)
-    for i, n in enumerate(DRONE_COUNTS):
-        run_sim(n, i)
-    print("Done. See results in:", DRONE_DATA_FILE)
+    parser = argparse.ArgumentParser(description="Run headless Godot simulations in parallel.")
+    parser.add_argument("--jobs", "-j", type=int, default=PARALLEL_RUNS, help="simulations to run at once (default: %(default)s)")
+    parser.add_argument("--timeout", type=int, default=RUN_TIMEOUT_SEC, help="seconds before a run is killed (default: %(default)s)")
+    parser.add_argument("--retries", type=int, default=MAX_RETRIES, help="extra attempts per failed run (default: %(default)s)")
+    args = parser.parse_args()
+    # Number after the simulations already merged (or kept after a failure), so no existing log is overwritten
+    first_id = next_sim_id()
+    jobs = [make_job(n, first_id + i) for i, n in enumerate(DRONE_COUNTS)]
+    print(f"Running {len(jobs)} simulations, {max(1, args.jobs)} at a time...")
+    succeeded = run_batch(jobs, max(1, args.jobs), args.timeout, args.retries)
+    for job in succeeded:
+        shutil.rmtree(run_dir_for(job), ignore_errors=True)
+    print(f"Done: {len(succeeded)}/{len(jobs)} simulations. See results in:", OUTPUT_ROOT)
 
 if __name__ == "__main__":
     main()
@@ -1,6 +1,8 @@
 import os
-import random
 import math
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
 # Configuration for experiment structure
 top_dir = os.path.join(os.path.dirname(__file__), "sampleOutput", "root")
@@ -12,72 +14,175 @@ count_range = list(range(1, 21))   # 1 to 20 inclusive
 mid_angle = 40.0
 mid_count = 10
 
+# Production schema (matches scripts/logger.gd): <Type>/<Strategy>/<Experiment>/Simulation-N.txt, timestamps in ms
+production_dir = os.path.join(os.path.dirname(__file__), "sampleOutput", "productionRoot")
+production_types = ["Makespan", "Spatial"]
+production_strategies = ["Centralized", "Decentralized"]
+production_folders = ["AngleFixed", "CountFixed", "BothFixed"]
+production_frames = 200      # spatial time steps per simulation
+production_interval_ms = 100 # motionplan log frequency
+production_null_rate = 0.0   # fraction of drones that never exit (logged as <null>)
+
+chunk_rows = 200_000  # rows generated and written per chunk, bounds memory for large files
+
 def ensure_dir(path):
     os.makedirs(path, exist_ok=True)
 
-def make_makespan_file(path, strategy, count, angle, fixed_type):
-    # 6 columns, one line per drone
-    lines = []
-    for drone in range(count):
-        # Centralized is always better (lower makespan)
-        base = 10 + (count * 0.5) + (0 if strategy == "centralized" else 5)
-        # Entry time: around 1s (in ms), exit time: 10-15s (in ms)
-        entry_time = int(1000 + random.uniform(-100, 100))
-        exit_time = int(random.uniform(10000, 15000))
-        makespan = base + random.uniform(-1, 1)
-        lines.append(f"{strategy}Weighted,{count},{angle},100{drone+1},{drone},{entry_time},{exit_time}")
+def file_rng(seed, index):
+    # Every file gets its own stream, so output does not depend on how files are sharded across processes
+    return np.random.default_rng(np.random.SeedSequence([seed, index]))
+
+def write_rows(file, template, columns):
+    # Format one chunk of column arrays with a row template and write it in a single call
+    file.write("".join(template.format(*row) for row in zip(*(column.tolist() for column in columns))))
+
+# --- Toy layout (sampleOutput/root) ---
+
+def make_makespan_file(path, strategy, count, angle, fixed_type, rng):
+    # 7 columns, one line per drone
+    # Entry time: around 1s (in ms), exit time: 10-15s (in ms)
+    drones = np.arange(count)
+    entry_time = (1000 + rng.uniform(-100, 100, count)).astype(np.int64)
+    exit_time = rng.uniform(10000, 15000, count).astype(np.int64)
     with open(path, "w") as f:
-        f.write("\n".join(lines) + "\n")
+        write_rows(f, f"{strategy}Weighted,{count},{angle},100{{}},{{}},{{}},{{}}\n", [drones + 1, drones, entry_time, exit_time])
 
-def make_spatial_file(path, strategy, count, angle, fixed_type):
-    # 7 columns, one line per drone per second (10 seconds)
-    lines = []
+def make_spatial_file(path, strategy, count, angle, fixed_type, rng, frames=10):
+    # 7 columns, one line per drone per second
     angle_rad = math.radians(angle)
-    for t in range(10):
-        for drone in range(count):
-            # Spread drones in a fan based on angle and count
-            if count > 1:
-                theta = (-angle_rad/2) + (angle_rad * drone / (count-1))
-            else:
-                theta = 0
-            # Centralized: tighter, Decentralized: more dispersed
-            base_radius = 1.0 + 0.1 * t
-            radius = base_radius + (0 if strategy == "centralized" else 0.2 * drone)
-            x = radius * math.cos(theta) + (0 if strategy == "centralized" else 0.2)
-            y = radius * math.sin(theta) + (0 if strategy == "centralized" else 0.2)
-            # Add some random noise for realism
-            x += random.uniform(-0.05, 0.05)
-            y += random.uniform(-0.05, 0.05)
-            lines.append(f"{strategy}Weighted,{count},{angle},100{drone+1},{t},{x:.2f},{y:.2f}")
+    drones = np.arange(count)
+    # Spread drones in a fan based on angle and count
+    theta = (-angle_rad / 2) + (angle_rad * drones / (count - 1)) if count > 1 else np.zeros(count)
+    # Centralized: tighter, Decentralized: more dispersed
+    spread = 0.0 if strategy == "centralized" else 0.2
+    chunk_frames = max(1, chunk_rows // max(count, 1))
     with open(path, "w") as f:
-        f.write("\n".join(lines) + "\n")
+        for start in range(0, frames, chunk_frames):
+            t = np.arange(start, min(frames, start + chunk_frames))[:, None]
+            radius = 1.0 + 0.1 * t + spread * drones
+            # Add some random noise for realism
+            x = radius * np.cos(theta) + spread + rng.uniform(-0.05, 0.05, radius.shape)
+            y = radius * np.sin(theta) + spread + rng.uniform(-0.05, 0.05, radius.shape)
+            ids, times = np.broadcast_to(drones + 1, x.shape), np.broadcast_to(t, x.shape)
+            write_rows(f, f"{strategy}Weighted,{count},{angle},100{{}},{{}},{{:.2f}},{{:.2f}}\n", [ids.ravel(), times.ravel(), x.ravel(), y.ravel()])
 
-def main():
+def toy_tasks(frames=10):
+    tasks = []
     for exp_type in experiment_types:
         for strategy in strategies:
             for folder in folders:
                 folder_path = os.path.join(top_dir, exp_type, strategy, folder)
-                ensure_dir(folder_path)
                 if folder == "angleFixed":
-                    for count in count_range:
-                        path = os.path.join(folder_path, f"count{count}.txt")
-                        if exp_type == "makespan":
-                            make_makespan_file(path, strategy, count, mid_angle, folder)
-                        else:
-                            make_spatial_file(path, strategy, count, mid_angle, folder)
+                    configs = [(f"count{count}.txt", count, mid_angle) for count in count_range]
                 elif folder == "countFixed":
-                    for angle in angle_range:
-                        path = os.path.join(folder_path, f"angle{angle}.txt")
-                        if exp_type == "makespan":
-                            make_makespan_file(path, strategy, mid_count, float(angle), folder)
-                        else:
-                            make_spatial_file(path, strategy, mid_count, float(angle), folder)
-                elif folder == "bothFixed":
-                    path = os.path.join(folder_path, "fixed.txt")
-                    if exp_type == "makespan":
-                        make_makespan_file(path, strategy, mid_count, mid_angle, folder)
-                    else:
-                        make_spatial_file(path, strategy, mid_count, mid_angle, folder)
+                    configs = [(f"angle{angle}.txt", mid_count, float(angle)) for angle in angle_range]
+                else:
+                    configs = [("fixed.txt", mid_count, mid_angle)]
+                tasks += [(exp_type, os.path.join(folder_path, name), strategy, count, angle, folder, frames) for name, count, angle in configs]
+    return tasks
+
+def run_toy_task(task, seed, index):
+    exp_type, path, strategy, count, angle, folder, frames = task
+    ensure_dir(os.path.dirname(path))
+    if exp_type == "makespan":
+        make_makespan_file(path, strategy, count, angle, folder, file_rng(seed, index))
+    else:
+        make_spatial_file(path, strategy, count, angle, folder, file_rng(seed, index), frames)
+
+# --- Production layout (Simulation-N.txt, matches the DataLogger) ---
+
+def make_production_makespan_file(path, strategy, count, angle, rng, null_rate=production_null_rate):
+    # strategy, droneCount, maxAngle, droneID, entryTime, exitTime (ms since the simulation started)
+    entry_time = rng.integers(800, 2500, count)
+    base = 10000 + 60 * count + (0 if strategy == "Centralized" else 1500)
+    exit_time = (entry_time + base + rng.integers(0, 3000, count)).astype(str).astype(object)
+    exit_time[rng.random(count) < null_rate] = "<null>"
+    with open(path, "w") as f:
+        write_rows(f, f"{strategy},{count},{angle},{{}},{{}},{{}}\n", [rng.permutation(count), entry_time, exit_time])
+
+def make_production_spatial_file(path, strategy, count, angle, rng, frames=production_frames, interval_ms=production_interval_ms):
+    # strategy, droneCount, maxAngle, droneID, timeStamp, x, y; one row per drone per log tick, in time order
+    heading = np.radians(rng.uniform(-angle / 2, angle / 2, count))
+    jitter = 0.3 if strategy == "Centralized" else 0.8
+    position = np.stack([-250 + rng.normal(0, 15, count), rng.normal(0, 10, count)], axis=1)
+    step = 25.0 * interval_ms / 1000  # field units moved per log tick
+    drones = np.arange(count)
+    chunk_frames = max(1, chunk_rows // max(count, 1))
+    with open(path, "w") as f:
+        for start in range(0, frames, chunk_frames):
+            n = min(frames, start + chunk_frames) - start
+            # Drift along each drone's heading plus noise, accumulated from the end of the previous chunk
+            moves = step * np.stack([np.cos(heading), np.sin(heading)], axis=1) + rng.normal(0, jitter, (n, count, 2))
+            track = position + np.cumsum(moves, axis=0)
+            position = track[-1]
+            times = 836 + interval_ms * np.arange(start, start + n)
+            write_rows(f, f"{strategy},{count},{angle},{{}},{{}},{{!r}},{{!r}}\n",
+                       [np.tile(drones, n), np.repeat(times, count), track[:, :, 0].ravel(), track[:, :, 1].ravel()])
+
+def production_tasks(root, counts, angles, replicates, frames):
+    # Simulation ids are unique per strategy across experiment folders, like the SimulationRunner's
+    tasks = []
+    for strategy in production_strategies:
+        sim_id = 0
+        for folder in production_folders:
+            if folder == "AngleFixed":
+                configs = [(count, mid_angle) for count in counts]
+            elif folder == "CountFixed":
+                configs = [(mid_count, float(angle)) for angle in angles]
+            else:
+                configs = [(mid_count, mid_angle)]
+            for count, angle in configs:
+                for _ in range(replicates):
+                    tasks.append((root, strategy, folder, sim_id, count, angle, frames))
+                    sim_id += 1
+    return tasks
+
+def write_production_simulation(root, strategy, folder, sim_id, count, angle, frames, rng):
+    # Write the makespan and spatial logs of one simulation
+    paths = [os.path.join(root, exp_type, strategy, folder, f"Simulation-{sim_id}.txt") for exp_type in production_types]
+    for path in paths:
+        ensure_dir(os.path.dirname(path))
+    make_production_makespan_file(paths[0], strategy, count, angle, rng)
+    make_production_spatial_file(paths[1], strategy, count, angle, rng, frames)
+    return paths
+
+def run_production_task(task, seed, index):
+    write_production_simulation(*task, file_rng(seed, index))
+
+# --- Entry point ---
+
+def run_tasks(runner, tasks, seed, jobs):
+    # Shard file generation across processes; each file is written by exactly one worker
+    if jobs <= 1:
+        for index, task in enumerate(tasks):
+            runner(task, seed, index)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        list(executor.map(runner, tasks, [seed] * len(tasks), range(len(tasks)), chunksize=max(1, len(tasks) // (4 * jobs))))
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate fake makespan and spatial data files.")
+    parser.add_argument("--schema", choices=["toy", "production"], default="toy",
+                        help="toy: sampleOutput/root layout; production: logger layout with Simulation-N.txt files")
+    parser.add_argument("--output", help="root folder to write (default: sampleOutput/root or sampleOutput/productionRoot)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", "-j", type=int, default=1, help="worker processes (default: %(default)s)")
+    parser.add_argument("--frames", type=int, help="spatial time steps per file (default: 10 toy, %d production)" % production_frames)
+    parser.add_argument("--counts", type=int, nargs=2, metavar=("MIN", "MAX"), default=[count_range[0], count_range[-1]],
+                        help="drone count range for AngleFixed (production only)")
+    parser.add_argument("--replicates", type=int, default=1, help="simulations per configuration (production only)")
+    args = parser.parse_args()
+    global top_dir
+    if args.schema == "toy":
+        top_dir = args.output or top_dir
+        tasks, runner = toy_tasks(args.frames or 10), run_toy_task
+    else:
+        counts = range(args.counts[0], args.counts[1] + 1)
+        tasks = production_tasks(args.output or production_dir, counts, angle_range, args.replicates, args.frames or production_frames)
+        runner = run_production_task
+    run_tasks(runner, tasks, args.seed, max(1, args.jobs))
+    files = len(tasks) * (len(production_types) if args.schema == "production" else 1)
+    print(f"Wrote {files} {args.schema} files to {args.output or (top_dir if args.schema == 'toy' else production_dir)}")
 
 if __name__ == "__main__":
     main()
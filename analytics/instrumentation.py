@@ -0,0 +1,108 @@
+# Instrumentation
+# Named stage timers and counters for the analytics pipeline, mergeable across worker processes, with JSON/CSV reports
+
+import csv
+import json
+import time
+from contextlib import nullcontext
+
+ENABLED = False  # Set with enable(); while False, timed() and count() do nothing
+
+_timers = {}    # name -> [calls, seconds]
+_counters = {}  # name -> total
+_maxima = {}    # name -> largest value seen
+_disabled = nullcontext()
+
+class _Timer:
+    """Context manager adding the time spent inside it to a named timer."""
+
+    __slots__ = ('name', 'startTime')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.startTime = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        timer = _timers.setdefault(self.name, [0, 0.0])
+        timer[0] += 1
+        timer[1] += time.perf_counter() - self.startTime
+        return False
+
+def enable(enabled=True):
+    """Turn instrumentation on (or off) for this process."""
+    global ENABLED
+    ENABLED = enabled
+
+def timed(name):
+    """Return a context manager that times its body under name (a no-op while disabled)."""
+    return _Timer(name) if ENABLED else _disabled
+
+def count(name, amount=1):
+    """Add amount to a named counter."""
+    if ENABLED:
+        _counters[name] = _counters.get(name, 0) + amount
+
+def observe(name, value):
+    """Record value under name, keeping the largest value seen (e.g., the biggest matrix solved)."""
+    if ENABLED and value > _maxima.get(name, float('-inf')):
+        _maxima[name] = value
+
+def reset():
+    """Clear all timers and counters."""
+    _timers.clear()
+    _counters.clear()
+    _maxima.clear()
+
+def snapshot():
+    """Return a copy of all timers and counters, e.g., to send from a worker process to the parent."""
+    return {'timers': {name: list(timer) for name, timer in _timers.items()},
+            'counters': dict(_counters), 'maxima': dict(_maxima)}
+
+def merge(other):
+    """Add the timers and counters of a snapshot into this process's totals."""
+    for name, (calls, seconds) in other['timers'].items():
+        timer = _timers.setdefault(name, [0, 0.0])
+        timer[0] += calls
+        timer[1] += seconds
+    for name, value in other['counters'].items():
+        _counters[name] = _counters.get(name, 0) + value
+    for name, value in other['maxima'].items():
+        if value > _maxima.get(name, float('-inf')):
+            _maxima[name] = value
+
+def report():
+    """Return the report as a list of rows: {'kind', 'name', 'calls', 'seconds', 'value'}, timers by time spent first.
+    Times from worker processes are summed, so stage totals can exceed the wall-clock time of a parallel run.
+    """
+    rows = [{'kind': 'timer', 'name': name, 'calls': calls, 'seconds': seconds, 'value': None}
+            for name, (calls, seconds) in sorted(_timers.items(), key=lambda item: -item[1][1])]
+    rows += [{'kind': 'counter', 'name': name, 'calls': None, 'seconds': None, 'value': value}
+             for name, value in sorted(_counters.items())]
+    rows += [{'kind': 'max', 'name': name, 'calls': None, 'seconds': None, 'value': value}
+             for name, value in sorted(_maxima.items())]
+    return rows
+
+def writeReport(path, extra=None):
+    """Write the report to path as CSV (.csv) or JSON (anything else). extra is added to the JSON output."""
+    rows = report()
+    if path.lower().endswith('.csv'):
+        with open(path, 'w', newline='') as file:
+            writer = csv.DictWriter(file, fieldnames=['kind', 'name', 'calls', 'seconds', 'value'])
+            writer.writeheader()
+            writer.writerows(rows)
+        return
+    with open(path, 'w') as file:
+        json.dump({**(extra or {}), 'rows': rows}, file, indent=2)
+
+def printSummary(limit=15, file=None):
+    """Print the slowest timers and all counters (to stdout by default)."""
+    print("\n=== Instrumentation ===", file=file)
+    for row in report():
+        if row['kind'] == 'timer' and limit > 0:
+            limit -= 1
+            print(f"  {row['name']:<36} {row['seconds']:>9.3f}s  ({row['calls']} calls)", file=file)
+        elif row['kind'] != 'timer':
+            print(f"  {row['name']:<36} {row['value']:>10}" + ('  (max)' if row['kind'] == 'max' else ''), file=file)
@@ -0,0 +1,276 @@
+# Data Manifest
+# SQLite index of the output-data tree (file metadata and per-frame byte offsets) for selective loading, used by analytics.py
+
+import os
+import re
+import math
+import sqlite3
+import argparse
+import numpy as np
+import instrumentation
+
+MANIFEST_VERSION = 2  # Bump when the schema or indexing changes so existing manifests are rebuilt
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.manifest.sqlite')  # Shared with analytics.py
+DATA_KINDS = ['makespan', 'spatial']
+SIMULATION_NAME = re.compile(r'Simulation-(\d+)\.txt$')
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY, kind TEXT, strategy TEXT COLLATE NOCASE, experiment TEXT COLLATE NOCASE, simId INTEGER,
+    droneCount INTEGER, angle REAL, rows INTEGER, frames INTEGER, firstTime INTEGER, lastTime INTEGER,
+    size INTEGER, mtime INTEGER
+);
+CREATE TABLE IF NOT EXISTS frames (
+    path TEXT, timeStamp INTEGER, offset INTEGER, length INTEGER, rows INTEGER, PRIMARY KEY (path, timeStamp)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS filesByConfig ON files (kind, strategy, experiment, droneCount, angle);
+'''
+
+# --- Indexing ---
+
+def _number(value, convert):
+    """Convert a logged value, returning None for the entries the text parser drops: '<null>', malformed and
+    non-finite values, and (for int) values with a fractional part.
+    """
+    try:
+        number = float(value)
+    except ValueError:
+        return None
+    if not math.isfinite(number) or (convert is int and number != math.floor(number)):
+        return None
+    return convert(number)
+
+def scanMakespan(filePath):
+    """Return the manifest fields of a makespan log: counts and the entry/exit time range."""
+    rows, times, firstLine = 0, [], None
+    with open(filePath, 'rb') as file:
+        for line in file:
+            vals = line.decode('utf-8', 'replace').strip().split(',')
+            if len(vals) < 6:
+                continue
+            firstLine = firstLine or vals
+            rows += 1
+            times += [t for t in (_number(vals[4], int), _number(vals[5], int)) if t is not None]
+    return firstLine, {'rows': rows, 'frames': None,
+                       'firstTime': min(times) if times else None, 'lastTime': max(times) if times else None}, []
+
+def scanSpatial(filePath):
+    """Return the manifest fields of a spatial log and the byte range of every frame (rows sharing a time stamp).
+    The logger writes rows in time order, so each frame is one contiguous block of lines.
+    """
+    rows, frames, firstLine = 0, [], None
+    offset, frameStart, frameRows, currentTime = 0, 0, 0, None
+    with open(filePath, 'rb') as file:
+        for line in file:
+            vals = line.split(b',')
+            timeStamp = _number(vals[4], int) if len(vals) >= 7 else None
+            if timeStamp is not None:
+                if firstLine is None:
+                    firstLine = line.decode('utf-8', 'replace').strip().split(',')
+                if timeStamp != currentTime:
+                    if frameRows:
+                        frames.append((currentTime, frameStart, offset - frameStart, frameRows))
+                    currentTime, frameStart, frameRows = timeStamp, offset, 0
+                frameRows += 1
+                rows += 1
+            offset += len(line)
+    if frameRows:
+        frames.append((currentTime, frameStart, offset - frameStart, frameRows))
+    times = [frame[0] for frame in frames]
+    return firstLine, {'rows': rows, 'frames': len(frames),
+                       'firstTime': min(times) if times else None, 'lastTime': max(times) if times else None}, frames
+
+def describePath(rootFolder, filePath):
+    """Return (kind, strategy, experiment, simId) from a path laid out as <Type>/<Strategy>/<Experiment>/<file>.txt."""
+    parts = os.path.relpath(filePath, rootFolder).split(os.sep)
+    if len(parts) != 4 or parts[0].lower() not in DATA_KINDS:
+        return None
+    match = SIMULATION_NAME.search(parts[3])
+    return parts[0].lower(), parts[1], parts[2], int(match.group(1)) if match else None
+
+def _pathPrefix(rootFolder):
+    """Return a LIKE pattern (with \\ as the escape character) matching every path under rootFolder."""
+    escaped = os.path.abspath(rootFolder).replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escaped + os.sep.replace('\\', '\\\\') + '%'
+
+# --- Manifest ---
+
+class Manifest:
+    """SQLite index of every data file under a root folder.
+    Records each file's strategy, experiment type, drone count, angle, row count and time range, plus the byte
+    offset of every spatial frame so a time range can be read without parsing the whole file.
+    """
+
+    def __init__(self, dbPath):
+        self.dbPath = dbPath
+        self.db = sqlite3.connect(dbPath)
+        self.db.row_factory = sqlite3.Row
+        version = self.db.execute('PRAGMA user_version').fetchone()[0]
+        if version != MANIFEST_VERSION:
+            self.db.executescript('DROP TABLE IF EXISTS files; DROP TABLE IF EXISTS frames;')
+            self.db.execute(f'PRAGMA user_version = {MANIFEST_VERSION}')
+        self.db.executescript(SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def update(self, rootFolder, folders=None):
+        """Index new and changed files under rootFolder and drop files that no longer exist.
+        With folders (e.g., <root>/Spatial/Decentralized/AngleFixed), only those folders are walked.
+        Only files whose size or modification time changed are rescanned. Returns (indexed, removed) counts.
+        """
+        rootFolder = os.path.abspath(rootFolder)
+        scopes = [os.path.abspath(folder) for folder in folders] if folders is not None else [rootFolder]
+        known = {}
+        for scope in scopes:
+            known.update((row['path'], (row['size'], row['mtime'])) for row in self.db.execute(
+                "SELECT path, size, mtime FROM files WHERE path LIKE ? ESCAPE '\\'", (_pathPrefix(scope),)))
+        seen, indexed = set(), 0
+        with self.db:
+            for folder, _, fileNames in (entry for scope in scopes for entry in os.walk(scope)):
+                for fileName in sorted(fileNames):
+                    filePath = os.path.join(folder, fileName)
+                    described = describePath(rootFolder, filePath) if fileName.endswith('.txt') else None
+                    if described is None:
+                        continue
+                    seen.add(filePath)
+                    info = os.stat(filePath)
+                    if known.get(filePath) == (info.st_size, info.st_mtime_ns):
+                        continue
+                    self._indexFile(filePath, described, info)
+                    indexed += 1
+            removed = [path for path in known if path not in seen]
+            for path in removed:
+                self.db.execute('DELETE FROM files WHERE path = ?', (path,))
+                self.db.execute('DELETE FROM frames WHERE path = ?', (path,))
+        return indexed, len(removed)
+
+    def _indexFile(self, filePath, described, info):
+        """Scan one file and replace its rows in the manifest."""
+        kind, strategy, experiment, simId = described
+        firstLine, fields, frames = (scanMakespan if kind == 'makespan' else scanSpatial)(filePath)
+        droneCount = _number(firstLine[1], int) if firstLine else None
+        angle = _number(firstLine[2], float) if firstLine else None
+        self.db.execute('DELETE FROM frames WHERE path = ?', (filePath,))
+        self.db.execute('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+            filePath, kind, strategy, experiment, simId, droneCount, angle, fields['rows'], fields['frames'],
+            fields['firstTime'], fields['lastTime'], info.st_size, info.st_mtime_ns))
+        self.db.executemany('INSERT INTO frames VALUES (?, ?, ?, ?, ?)', [(filePath, *frame) for frame in frames])
+
+    def query(self, kind=None, strategy=None, experiment=None, droneCount=None, angle=None, rootFolder=None):
+        """Return the manifest rows (as dicts) of the files matching every given filter, ordered by path.
+        strategy and experiment match case-insensitively. droneCount and angle take a value or an inclusive
+        (min, max) range, where either end can be None.
+        """
+        clauses, params = [], []
+        for column, value in (('kind', kind), ('strategy', strategy), ('experiment', experiment)):
+            if value is not None:
+                clauses.append(f'{column} = ?')
+                params.append(value.lower() if column == 'kind' else value)
+        for column, value in (('droneCount', droneCount), ('angle', angle)):
+            low, high = value if isinstance(value, (tuple, list)) else (value, value)
+            if low is not None:
+                clauses.append(f'{column} >= ?')
+                params.append(low)
+            if high is not None:
+                clauses.append(f'{column} <= ?')
+                params.append(high)
+        if rootFolder is not None:
+            clauses.append("path LIKE ? ESCAPE '\\'")
+            params.append(_pathPrefix(rootFolder))
+        where = ' WHERE ' + ' AND '.join(clauses) if clauses else ''
+        return [dict(row) for row in self.db.execute(f'SELECT * FROM files{where} ORDER BY path', params)]
+
+    def lookup(self, filePath):
+        """Return the manifest row of a file if it is indexed and unchanged since, otherwise None."""
+        filePath = os.path.abspath(filePath)
+        row = self.db.execute('SELECT * FROM files WHERE path = ?', (filePath,)).fetchone()
+        if row is None:
+            return None
+        info = os.stat(filePath)
+        return dict(row) if (row['size'], row['mtime']) == (info.st_size, info.st_mtime_ns) else None
+
+    def frameRange(self, filePath, timeRange=None):
+        """Return (offset, length, frames, rows) of the contiguous bytes holding the frames of a spatial file
+        whose time stamps fall in the inclusive (min, max) ms range (all frames by default).
+        """
+        low, high = timeRange if timeRange is not None else (None, None)
+        row = self.db.execute(
+            'SELECT MIN(offset), MAX(offset + length), COUNT(*), SUM(rows) FROM frames '
+            'WHERE path = ? AND timeStamp >= ? AND timeStamp <= ?',
+            (os.path.abspath(filePath), -2 ** 63 if low is None else low, 2 ** 63 - 1 if high is None else high)).fetchone()
+        if not row[2]:
+            return 0, 0, 0, 0
+        return row[0], row[1] - row[0], row[2], row[3]
+
+    def iterFrames(self, filePath, timeRange=None):
+        """Yield (timeStamp, positions) for the frames of a spatial file in a time range, reading only their bytes."""
+        offset, length, _, _ = self.frameRange(filePath, timeRange)
+        if not length:
+            return
+        with open(filePath, 'rb') as file:
+            file.seek(offset)
+            block = file.read(length)
+        lines = block.splitlines()
+        rows, invalid = 0, 0
+        currentTime, positions = None, []
+        try:
+            for line in lines:
+                vals = line.split(b',')
+                if len(vals) < 7:
+                    continue
+                rows += 1
+                timeStamp, x, y = _number(vals[4], int), _number(vals[5], float), _number(vals[6], float)
+                if timeStamp is None or x is None or y is None:
+                    invalid += 1
+                    continue
+                if timeStamp != currentTime:
+                    if positions:
+                        yield currentTime, np.array(positions)
+                    currentTime, positions = timeStamp, []
+                positions.append((x, y))
+            if positions:
+                yield currentTime, np.array(positions)
+        finally:
+            # Same counters as a full parse in analytics.py, for the rows in the range only
+            instrumentation.count('parse.filesRead')
+            instrumentation.count('parse.rows', rows)
+            instrumentation.count('parse.shortRowsSkipped', len(lines) - rows)
+            instrumentation.count('parse.invalidPositionRows', invalid)
+
+# --- Command Line ---
+
+def parseRange(text, convert):
+    """Parse 'MIN:MAX', 'MIN:' or ':MAX' (or a single value) into an inclusive range."""
+    low, _, high = text.partition(':') if ':' in text else (text, None, text)
+    return (convert(low) if low else None, convert(high) if high else None)
+
+def main():
+    parser = argparse.ArgumentParser(description='Index an output-data tree and list the files matching a query.')
+    parser.add_argument('root', help='data root containing Makespan/ and Spatial/')
+    parser.add_argument('--db', default=DEFAULT_PATH, help='manifest file (default: the one analytics.py uses, %(default)s)')
+    parser.add_argument('--kind', choices=DATA_KINDS)
+    parser.add_argument('--strategy')
+    parser.add_argument('--experiment')
+    parser.add_argument('--count', help='drone count or MIN:MAX range')
+    parser.add_argument('--angle', help='angle or MIN:MAX range')
+    parser.add_argument('--time', help='time stamp MIN:MAX range (ms) for spatial frames')
+    args = parser.parse_args()
+    manifest = Manifest(args.db)
+    indexed, removed = manifest.update(args.root)
+    print(f"Indexed {indexed} new or changed files, removed {removed}")
+    rows = manifest.query(args.kind, args.strategy, args.experiment,
+                          parseRange(args.count, int) if args.count else None,
+                          parseRange(args.angle, float) if args.angle else None, args.root)
+    timeRange = parseRange(args.time, int) if args.time else None
+    for row in rows:
+        line = f"{row['kind']:>8} {row['strategy']:>14} {row['experiment']:>11} count={row['droneCount']} angle={row['angle']} rows={row['rows']}"
+        if row['kind'] == 'spatial':
+            _, length, frames, frameRows = manifest.frameRange(row['path'], timeRange)
+            line += f" frames={frames} ({frameRows} rows, {length} bytes)"
+        print(f"{line}  {os.path.relpath(row['path'], args.root)}")
+    print(f"{len(rows)} files")
+    manifest.close()
+
+if __name__ == "__main__":
+    main()
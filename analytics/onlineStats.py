@@ -0,0 +1,159 @@
+# Online Statistics
+# Mergeable constant-size summaries (Welford mean/variance + KLL quantile sketch) used by analytics.py
+
+import math
+import random
+import numpy as np
+
+class KllSketch:
+    """KLL quantile sketch. Keeps O(k) items; rank error shrinks roughly as 1/k.
+    Exact while fewer than k items have been added. Sketches of the same k can be merged.
+    """
+
+    def __init__(self, k=400, seed=0):
+        self.k = k
+        self.count = 0
+        self.levels = [[]]
+        self._random = random.Random(seed)
+
+    def _capacity(self, level):
+        """Return the number of items a level can hold before it is compacted (smaller for lower levels)."""
+        depth = len(self.levels) - level - 1
+        return max(2, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _compress(self):
+        """Compact full levels: sort, keep every other item and promote the survivors one level up."""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append([])
+                items.sort()
+                # Keep the odd item out at this level so the total weight is preserved
+                leftover = [items.pop()] if len(items) % 2 else []
+                offset = self._random.randint(0, 1)
+                self.levels[level + 1].extend(items[offset::2])
+                self.levels[level] = leftover
+                level = 0
+            else:
+                level += 1
+
+    def update(self, values):
+        """Add an iterable of values to the sketch."""
+        values = [float(value) for value in values]
+        self.levels[0].extend(values)
+        self.count += len(values)
+        self._compress()
+        return self
+
+    def merge(self, other):
+        """Fold another sketch into this one."""
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for level, items in enumerate(other.levels):
+            self.levels[level].extend(items)
+        self.count += other.count
+        self._compress()
+        return self
+
+    def isExact(self):
+        """Return True while no compaction has happened, i.e., the sketch holds every value."""
+        return len(self.levels) == 1 or not any(self.levels[1:])
+
+    def quantile(self, q):
+        """Return the estimated q-quantile (0 <= q <= 1). Matches np.percentile while the sketch is exact."""
+        if not self.count:
+            return float('nan')
+        if self.isExact():
+            return float(np.percentile(self.levels[0], q * 100))
+        values = np.concatenate([np.asarray(items, dtype=np.float64) for items in self.levels])
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        cumulative = np.cumsum(weights[order])
+        index = np.searchsorted(cumulative, q * cumulative[-1], side='left')
+        return float(values[order][min(index, len(values) - 1)])
+
+class OnlineStats:
+    """Mergeable summary of a stream of samples: count, mean and variance (Welford), min/max and quantiles (KLL).
+    Update per file, merge across files or worker processes, and read statistics without keeping the samples.
+    """
+
+    def __init__(self, sketchK=400, seed=0):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = float('inf')
+        self.max = float('-inf')
+        self.sketch = KllSketch(sketchK, seed)
+
+    @classmethod
+    def fromValues(cls, values, sketchK=400, seed=0):
+        """Return a summary of the given values."""
+        return cls(sketchK, seed).update(values)
+
+    @classmethod
+    def fromDict(cls, data):
+        """Rebuild a summary from toDict() output. Later compactions of its sketch use a fresh random stream."""
+        summary = cls(data['sketchK'])
+        summary.count, summary.mean, summary.m2 = data['count'], data['mean'], data['m2']
+        summary.min, summary.max = data['min'], data['max']
+        summary.sketch.count, summary.sketch.levels = data['count'], [list(items) for items in data['levels']]
+        return summary
+
+    def toDict(self):
+        """Return the summary as a JSON-serializable dict (see fromDict())."""
+        return {'sketchK': self.sketch.k, 'count': self.count, 'mean': self.mean, 'm2': self.m2,
+                'min': self.min, 'max': self.max, 'levels': [list(items) for items in self.sketch.levels]}
+
+    def __len__(self):
+        return self.count
+
+    def update(self, values):
+        """Add a batch of values (combined with the running totals using the parallel form of Welford's method)."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not values.size:
+            return self
+        batch = OnlineStats(self.sketch.k)
+        batch.count = values.size
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.min, batch.max = float(values.min()), float(values.max())
+        batch.sketch = None
+        self._combine(batch)
+        self.sketch.update(values.tolist())
+        return self
+
+    def _combine(self, other):
+        """Combine the moments of another summary into this one."""
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / total
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.count = total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def merge(self, other):
+        """Fold another summary into this one. Returns self so merges can be chained."""
+        self._combine(other)
+        self.sketch.merge(other.sketch)
+        return self
+
+    def variance(self, ddof=1):
+        """Return the sample variance (ddof=1) or population variance (ddof=0)."""
+        return self.m2 / (self.count - ddof) if self.count > ddof else 0.0
+
+    def std(self, ddof=1):
+        """Return the standard deviation."""
+        return math.sqrt(self.variance(ddof))
+
+    def sem(self):
+        """Return the standard error of the mean."""
+        return self.std() / math.sqrt(self.count) if self.count > 1 else 0.0
+
+    def quantile(self, q):
+        """Return the estimated q-quantile (0 <= q <= 1)."""
+        return self.sketch.quantile(q)
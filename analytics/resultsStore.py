@@ -0,0 +1,140 @@
+# Results Store
+# SQLite store of per-file and per-folder analysis results, keyed by the code and settings versions that produced them, used by analytics.py
+
+import os
+import json
+import sqlite3
+import hashlib
+import argparse
+
+STORE_VERSION = 1  # Bump when the schema changes so existing stores are rebuilt
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS settings (
+    key TEXT PRIMARY KEY, metric TEXT, settings TEXT
+);
+CREATE TABLE IF NOT EXISTS fileResults (
+    path TEXT, key TEXT, folder TEXT, size INTEGER, mtime INTEGER, source TEXT, result TEXT, PRIMARY KEY (path, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS groupResults (
+    folder TEXT, key TEXT, members TEXT, files INTEGER, result TEXT, PRIMARY KEY (folder, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fileResultsByFolder ON fileResults (folder, key);
+'''
+
+def settingsKey(settings):
+    """Return the key of a settings dict (the same for equal settings regardless of key order)."""
+    return hashlib.sha1(json.dumps(settings, sort_keys=True).encode('utf-8')).hexdigest()
+
+def membersKey(fingerprints):
+    """Return the key of an ordered list of file fingerprints (path, size, mtime, source)."""
+    return hashlib.sha1(json.dumps([list(fingerprint) for fingerprint in fingerprints]).encode('utf-8')).hexdigest()
+
+# --- Results Store ---
+
+class ResultsStore:
+    """SQLite store of analysis results that persists between runs.
+    A file result is valid while the file's (size, mtime, source) fingerprint is unchanged. A group result (e.g., the
+    merged summary of a folder) is valid while its ordered list of member fingerprints is unchanged. Both are keyed by
+    a settings dict (code version, solver settings, ...), so changing a setting never returns stale values.
+    Results are stored as JSON.
+    """
+
+    def __init__(self, dbPath):
+        self.dbPath = dbPath
+        self.db = sqlite3.connect(dbPath)
+        self.db.row_factory = sqlite3.Row
+        version = self.db.execute('PRAGMA user_version').fetchone()[0]
+        if version != STORE_VERSION:
+            self.db.executescript('DROP TABLE IF EXISTS settings; DROP TABLE IF EXISTS fileResults; '
+                                  'DROP TABLE IF EXISTS groupResults;')
+            self.db.execute(f'PRAGMA user_version = {STORE_VERSION}')
+        self.db.executescript(SCHEMA)
+        self._recorded = set()
+
+    def close(self):
+        self.db.close()
+
+    def _key(self, metric, settings):
+        """Record a settings dict and return its key."""
+        key = settingsKey(settings)
+        if key not in self._recorded:
+            with self.db:
+                self.db.execute('INSERT OR IGNORE INTO settings VALUES (?, ?, ?)', (key, metric, json.dumps(settings, sort_keys=True)))
+            self._recorded.add(key)
+        return key
+
+    def fileResults(self, metric, settings, fingerprints):
+        """Return {path: result} for the files whose stored result matches their fingerprint (path, size, mtime, source)."""
+        key = self._key(metric, settings)
+        wanted = {fingerprint[0]: tuple(fingerprint[1:]) for fingerprint in fingerprints}
+        found = {}
+        for folder in sorted({os.path.dirname(path) for path in wanted}):
+            for row in self.db.execute('SELECT path, size, mtime, source, result FROM fileResults WHERE folder = ? AND key = ?',
+                                       (folder, key)):
+                if wanted.get(row['path']) == (row['size'], row['mtime'], row['source']):
+                    found[row['path']] = json.loads(row['result'])
+        return found
+
+    def putFileResults(self, metric, settings, fingerprints, results):
+        """Store one result per fingerprint (path, size, mtime, source), replacing older results of the same files."""
+        key = self._key(metric, settings)
+        with self.db:
+            self.db.executemany('INSERT OR REPLACE INTO fileResults VALUES (?, ?, ?, ?, ?, ?, ?)', [
+                (path, key, os.path.dirname(path), size, mtime, source, json.dumps(result))
+                for (path, size, mtime, source), result in zip(fingerprints, results)])
+
+    def groupResult(self, folder, metric, settings, fingerprints):
+        """Return the stored result of a folder if it was combined from exactly these files, otherwise None."""
+        row = self.db.execute('SELECT members, result FROM groupResults WHERE folder = ? AND key = ?',
+                              (folder, self._key(metric, settings))).fetchone()
+        if row is None or row['members'] != membersKey(fingerprints):
+            return None
+        return json.loads(row['result'])
+
+    def putGroupResult(self, folder, metric, settings, fingerprints, result):
+        """Store the combined result of a folder and drop stored file results of files no longer in it."""
+        key = self._key(metric, settings)
+        paths = {fingerprint[0] for fingerprint in fingerprints}
+        with self.db:
+            self.db.execute('INSERT OR REPLACE INTO groupResults VALUES (?, ?, ?, ?, ?)',
+                            (folder, key, membersKey(fingerprints), len(fingerprints), json.dumps(result)))
+            removed = [(row['path'], key) for row in self.db.execute(
+                'SELECT path FROM fileResults WHERE folder = ? AND key = ?', (folder, key)) if row['path'] not in paths]
+            self.db.executemany('DELETE FROM fileResults WHERE path = ? AND key = ?', removed)
+
+    def summary(self):
+        """Return one row per metric and settings: metric, settings (dict), files and groups stored."""
+        rows = self.db.execute(
+            'SELECT s.metric, s.settings, '
+            '(SELECT COUNT(*) FROM fileResults f WHERE f.key = s.key) AS files, '
+            '(SELECT COUNT(*) FROM groupResults g WHERE g.key = s.key) AS groups '
+            'FROM settings s ORDER BY s.metric, s.settings')
+        return [dict(row, settings=json.loads(row['settings'])) for row in rows]
+
+    def clear(self):
+        """Delete every stored result."""
+        with self.db:
+            self.db.executescript('DELETE FROM settings; DELETE FROM fileResults; DELETE FROM groupResults;')
+        self._recorded.clear()
+
+# --- Command Line ---
+
+def main():
+    parser = argparse.ArgumentParser(description='List what a results store holds, or clear it.')
+    parser.add_argument('db', help='results store file (e.g., analytics/.results.sqlite)')
+    parser.add_argument('--clear', action='store_true', help='delete every stored result')
+    args = parser.parse_args()
+    if not os.path.exists(args.db):
+        print(f"No results store at '{args.db}'")
+        return
+    store = ResultsStore(args.db)
+    if args.clear:
+        store.clear()
+        print(f"Cleared {args.db}")
+    for row in store.summary():
+        print(f"{row['metric']:>24} files={row['files']:<6} groups={row['groups']:<4} {json.dumps(row['settings'], sort_keys=True)}")
+    store.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,199 @@
+# Spatial Binary Format
+# Compact columnar copies of spatial logs (header stored once, float32 positions) with a converter and a memory-mapped reader
+
+import os
+import sys
+import json
+import struct
+import argparse
+import numpy as np
+
+MAGIC = b'SWSPATL\x00'
+FORMAT_VERSION = 1
+BINARY_SUFFIX = '.bin'
+ALIGNMENT = 64  # Every column starts on a 64-byte boundary so it can be viewed in place
+
+# Layout: MAGIC, uint32 header length, JSON header, then the columns listed in header['arrays'] at aligned offsets.
+# Rows are grouped into frames (one time step each) in file order:
+#   frameTimes  int64[frames]      time stamp of each frame (ms)
+#   frameStarts int64[frames + 1]  first row of each frame, plus the total row count
+#   droneIndex  uint16/uint32[rows] index into header['droneIds']
+#   positions   float32[rows, 2]   x, y
+
+def binaryPath(textPath):
+    """Return the path of the binary copy of a spatial text log (Simulation-N.txt -> Simulation-N.bin)."""
+    return os.path.splitext(textPath)[0] + BINARY_SUFFIX
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+# --- Writing ---
+
+def encodeColumns(columns, firstLine, source=None):
+    """Return (header, arrays) for parsed spatial columns (droneID, timeStamp, x, y in file order).
+    source is the (size, mtime) of the text log, used to tell whether the binary copy is stale.
+    """
+    timeStamps = np.asarray(columns['timeStamp'], dtype=np.int64)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(timeStamps)) + 1)).astype(np.int64)
+    droneIds, droneIndex = np.unique(np.asarray(columns['droneID'], dtype=str), return_inverse=True)
+    indexType = np.uint16 if len(droneIds) <= np.iinfo(np.uint16).max else np.uint32
+    arrays = {
+        'frameTimes': timeStamps[starts] if len(timeStamps) else np.empty(0, dtype=np.int64),
+        'frameStarts': np.append(starts if len(timeStamps) else np.empty(0, dtype=np.int64), len(timeStamps)),
+        'droneIndex': droneIndex.astype(indexType),
+        'positions': np.column_stack((columns['x'], columns['y'])).astype(np.float32)
+    }
+    header = {
+        'version': FORMAT_VERSION, 'firstLine': list(firstLine), 'rows': int(len(timeStamps)),
+        'frames': int(len(arrays['frameTimes'])), 'droneIds': droneIds.tolist(),
+        'source': {'size': source[0], 'mtime': source[1]} if source else None
+    }
+    return header, arrays
+
+def writeSpatialBinary(path, header, arrays):
+    """Write a header and its columns to path (through a temporary file, so readers never see a partial file)."""
+    header = dict(header, arrays={})
+    # The header length depends on the offsets it lists, so lay out the columns against an upper bound
+    headerLength = len(json.dumps(dict(header, arrays={name: [0, '', []] for name in arrays}))) + 64 * len(arrays) + 256
+    offset = _aligned(len(MAGIC) + 4 + headerLength)
+    for name, array in arrays.items():
+        header['arrays'][name] = [offset, array.dtype.str, list(array.shape)]
+        offset = _aligned(offset + array.nbytes)
+    encoded = json.dumps(header).encode('utf-8').ljust(headerLength)
+    tmpPath = path + f'.{os.getpid()}.tmp'
+    with open(tmpPath, 'wb') as file:
+        file.write(MAGIC + struct.pack('<I', headerLength) + encoded)
+        for name, array in arrays.items():
+            file.seek(header['arrays'][name][0])
+            file.write(np.ascontiguousarray(array).tobytes())
+        file.truncate(offset)
+    os.replace(tmpPath, path)
+
+def convertSpatialFile(textPath, parser):
+    """Convert a spatial text log to its binary copy. parser(path) returns (columns, firstLine), as the analytics
+    text parser does. Returns (text bytes, binary bytes).
+    """
+    info = os.stat(textPath)
+    columns, firstLine = parser(textPath)
+    header, arrays = encodeColumns(columns, firstLine, (info.st_size, info.st_mtime_ns))
+    writeSpatialBinary(binaryPath(textPath), header, arrays)
+    return info.st_size, os.path.getsize(binaryPath(textPath))
+
+# --- Reading ---
+
+def openSpatialBinary(path):
+    """Memory-map a binary spatial file. Returns {'header': ..., <column>: read-only array view} without copying."""
+    with open(path, 'rb') as file:
+        prefix = file.read(len(MAGIC) + 4)
+        if len(prefix) < len(MAGIC) + 4 or prefix[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"'{path}' is not a binary spatial file")
+        headerLength, = struct.unpack('<I', prefix[len(MAGIC):])
+        header = json.loads(file.read(headerLength))
+    if header.get('version') != FORMAT_VERSION:
+        raise ValueError(f"'{path}' has format version {header.get('version')}, expected {FORMAT_VERSION}")
+    raw = np.memmap(path, dtype=np.uint8, mode='r')
+    data = {'header': header}
+    for name, (offset, dtype, shape) in header['arrays'].items():
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+        data[name] = raw[offset:offset + count * dtype.itemsize].view(dtype).reshape(shape)
+    return data
+
+def currentBinary(textPath):
+    """Return the opened binary copy of a spatial text log if it exists and matches the text file, otherwise None."""
+    path = binaryPath(textPath)
+    if not os.path.exists(path):
+        return None
+    try:
+        data = openSpatialBinary(path)
+    except (OSError, ValueError):
+        return None
+    info = os.stat(textPath)
+    if data['header']['source'] != {'size': info.st_size, 'mtime': info.st_mtime_ns}:
+        return None
+    return data
+
+def iterFrames(data, timeRange=None):
+    """Yield (timeStamp, positions) per frame, where positions is an (n, 2) float32 view into the mapped file.
+    With an inclusive (min, max) ms timeRange, only the frames in that range are visited.
+    """
+    frameTimes, frameStarts, positions = data['frameTimes'], data['frameStarts'], data['positions']
+    first, last = 0, len(frameTimes)
+    if timeRange is not None:
+        if timeRange[0] is not None:
+            first = int(np.searchsorted(frameTimes, timeRange[0], side='left'))
+        if timeRange[1] is not None:
+            last = int(np.searchsorted(frameTimes, timeRange[1], side='right'))
+    for frame in range(first, last):
+        yield int(frameTimes[frame]), positions[frameStarts[frame]:frameStarts[frame + 1]]
+
+def columns(data):
+    """Return the columns of the text parser (droneID, timeStamp, x, y). x and y are views into the mapped file."""
+    return {
+        'droneID': np.asarray(data['header']['droneIds'], dtype=str)[data['droneIndex']],
+        'timeStamp': np.repeat(data['frameTimes'], np.diff(data['frameStarts'])),
+        'x': data['positions'][:, 0],
+        'y': data['positions'][:, 1]
+    }
+
+def validate(textPath, parser):
+    """Check that the binary copy of a text log holds the same rows as the text parser.
+    Positions must equal the text values rounded to float32 (the precision the simulator logs at).
+    Returns the largest absolute position difference, or raises ValueError on a mismatch.
+    """
+    data = currentBinary(textPath)
+    if data is None:
+        raise ValueError(f"No up-to-date binary copy of '{textPath}'")
+    expected, _ = parser(textPath)
+    actual = columns(data)
+    if not np.array_equal(expected['timeStamp'], actual['timeStamp']):
+        raise ValueError(f"Time stamps differ in '{textPath}'")
+    if not np.array_equal(np.asarray(expected['droneID'], dtype=str), actual['droneID']):
+        raise ValueError(f"Drone IDs differ in '{textPath}'")
+    maxError = 0.0
+    for axis in ('x', 'y'):
+        if not np.array_equal(np.asarray(expected[axis], dtype=np.float32), actual[axis]):
+            raise ValueError(f"{axis} positions differ in '{textPath}' beyond float32 rounding")
+        if len(actual[axis]):
+            maxError = max(maxError, float(np.abs(expected[axis] - actual[axis].astype(np.float64)).max()))
+    return maxError
+
+# --- Command Line ---
+
+def _convertOne(force, check, textPath):
+    """Convert (and optionally validate) one file. Returns (text bytes, binary bytes, max error or None, converted)."""
+    import analytics
+    converted = force or currentBinary(textPath) is None
+    if converted:
+        textSize, binarySize = convertSpatialFile(textPath, analytics._parseSpatialText)
+    else:
+        textSize, binarySize = os.path.getsize(textPath), os.path.getsize(binaryPath(textPath))
+    maxError = validate(textPath, analytics._parseSpatialText) if check else None
+    return textSize, binarySize, maxError, converted
+
+def main():
+    import analytics
+    from functools import partial
+    parser = argparse.ArgumentParser(description='Convert spatial text logs to the compact binary format.')
+    parser.add_argument('root', help='data root (every .txt under a Spatial folder is converted)')
+    parser.add_argument('--validate', action='store_true', help='check every binary file against the text parser')
+    parser.add_argument('--force', action='store_true', help='rewrite binary files that are already up to date')
+    parser.add_argument('--jobs', '-j', type=int, default=analytics.JOBS, help='worker processes (default: %(default)s)')
+    args = parser.parse_args()
+    textPaths = []
+    for folder, _, fileNames in os.walk(args.root):
+        if 'spatial' in os.path.relpath(folder, args.root).lower().split(os.sep)[:1]:
+            textPaths += [os.path.join(folder, name) for name in sorted(fileNames) if name.endswith('.txt')]
+    try:
+        results = analytics.mapFiles(partial(_convertOne, args.force, args.validate), textPaths, 'convert', max(1, args.jobs))
+    except ValueError as error:
+        print(f"Validation failed: {error}")
+        sys.exit(1)
+    textBytes, binaryBytes = sum(r[0] for r in results), sum(r[1] for r in results)
+    print(f"Converted {sum(r[3] for r in results)} of {len(textPaths)} spatial logs "
+          f"({textBytes / 1e6:.1f} MB text -> {binaryBytes / 1e6:.1f} MB binary)")
+    if args.validate and results:
+        print(f"Validated {len(results)} files, largest position difference {max(r[2] for r in results):.3g}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Trajectory Metrics
+# Per-drone path length and speed, and per-frame separation and near misses (KD-tree), used by analytics.py
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+# --- Per-Drone Metrics ---
+
+def droneTracks(droneIDs, timeStamps, x, y):
+    """Return per-drone path length (field units), duration (ms) and mean speed (units per second).
+    Rows can come in any order; they are grouped by drone and sorted by time, and consecutive positions of the
+    same drone are differenced in one vectorized pass.
+    """
+    droneNames, droneIndex = np.unique(np.asarray(droneIDs, dtype=str), return_inverse=True)
+    timeStamps = np.asarray(timeStamps, dtype=np.int64)
+    order = np.lexsort((timeStamps, droneIndex))
+    drones, times = droneIndex[order], timeStamps[order]
+    xs, ys = np.asarray(x, dtype=np.float64)[order], np.asarray(y, dtype=np.float64)[order]
+    sameDrone = drones[1:] == drones[:-1]
+    steps = np.hypot(np.diff(xs), np.diff(ys))
+    pathLength = np.bincount(drones[1:][sameDrone], weights=steps[sameDrone], minlength=len(droneNames))
+    # First and last time stamp of each drone (rows are sorted by drone, then time)
+    firstRow = np.searchsorted(drones, np.arange(len(droneNames)), side='left')
+    lastRow = np.searchsorted(drones, np.arange(len(droneNames)), side='right') - 1
+    duration = (times[lastRow] - times[firstRow]).astype(np.float64) if len(times) else np.zeros(len(droneNames))
+    speed = np.divide(pathLength, duration / 1000, out=np.full(len(droneNames), np.nan), where=duration > 0)
+    return {'droneIDs': droneNames, 'pathLength': pathLength, 'duration': duration, 'meanSpeed': speed}
+
+# --- Per-Frame Metrics ---
+
+def frameProximity(positions, nearMissDistance):
+    """Return (minimum inter-drone distance, near-miss pairs) for one frame of (n, 2) positions.
+    Uses a KD-tree, so a frame costs O(n log n) instead of comparing every pair.
+    """
+    if len(positions) < 2:
+        return np.inf, 0
+    tree = cKDTree(positions)
+    distances, _ = tree.query(positions, k=2)
+    nearMisses = len(tree.query_pairs(nearMissDistance, output_type='ndarray'))
+    return float(distances[:, 1].min()), nearMisses
+
+def proximitySeries(framesIter, nearMissDistance):
+    """Return per-frame arrays (timeStamp, minSeparation, nearMisses) from an iterable of (timeStamp, positions)."""
+    timeStamps, separations, nearMisses = [], [], []
+    for timeStamp, positions in framesIter:
+        separation, misses = frameProximity(positions, nearMissDistance)
+        timeStamps.append(timeStamp)
+        separations.append(separation)
+        nearMisses.append(misses)
+    return {
+        'timeStamp': np.array(timeStamps, dtype=np.int64),
+        'minSeparation': np.array(separations, dtype=np.float64),
+        'nearMisses': np.array(nearMisses, dtype=np.int64)
+    }
@@ -66,8 +66,40 @@ func add_sim(sim: Swarm_Sim):
 	add_child(sim)                           # add it to the tree.
 	current_pos += 1
 
-## Adds 3 running simulations to the field in order to test it.
+## returns the --key=value user args (everything after '--' on the command line) as a dictionary.
+func get_user_args() -> Dictionary:
+	var user_args = {}
+	for arg in OS.get_cmdline_user_args():
+		if arg.begins_with("--") and "=" in arg:
+			var key_value = arg.trim_prefix("--").split("=", true, 1)
+			user_args[key_value[0]] = key_value[1]
+	return user_args
+
+## runs the single simulation described by the user args (used by generateData.py & adaptiveSweep.py), then quits once its data is logged.
+## --drone-count is required; --sim-id defaults to 0 and --strategy, --experiment-type & --max-angle fall back to the default parameters.
+func run_from_user_args(user_args: Dictionary):
+	var p = default_parameters.duplicate()
+	p[6] = user_args.get("strategy", p[6])
+	p[7] = user_args["drone-count"].to_int()
+	if user_args.has("max-angle"):
+		p[9] = user_args["max-angle"].to_float()
+	var experiment_type: String = user_args.get("experiment-type", p[10])
+	p[10] = experiment_type if experiment_type.ends_with("/") else experiment_type + "/" # the logger expects the trailing '/'
+	
+	var sim = create_sim_from_array(p)
+	sim.id_number = user_args.get("sim-id", "0").to_int() # must be set before add_sim(), the logger reads it when the sim is ready.
+	add_sim(sim)
+	
+	# the logger saves its files on this one-shot timer's timeout; quit right after (signals run in connection order).
+	sim.get_logger().log_timer.connect("timeout", get_tree().quit)
+
+## Adds 3 running simulations to the field in order to test it, or runs a single simulation when started with user args (see run_from_user_args()).
 func _ready() -> void:
+	var user_args = get_user_args()
+	if user_args.has("drone-count"):
+		run_from_user_args(user_args)
+		return
+	
 	var sim = create_sim_from_array(default_parameters)
 	add_sim(sim)
 	sim = create_sim_from_array(default_parameters)
@@ -79,6 +79,7 @@ func get_drones():
 
 ## logs a 2d array as a .txt csv file into the specified filepath.
 func save_csv_file(data, write_filepath: String):
+	DirAccess.make_dir_recursive_absolute(write_filepath.get_base_dir()) # output folders may not exist yet (e.g. --output-dir)
 	var file = FileAccess.open(write_filepath, FileAccess.WRITE)
 	
 	# read each element in the array (which will be a second array),
@@ -96,9 +97,17 @@ func _ready() -> void:
 	makespan_rect.connect("body_exited", log_makespan_data)
 	
 
+## returns the root data folder. Can be overridden with the --output-dir=<path> user arg (used by generateData.py to give each parallel run its own folder).
+func get_root() -> String:
+	for arg in OS.get_cmdline_user_args():
+		if arg.begins_with("--output-dir="):
+			var dir = arg.trim_prefix("--output-dir=")
+			return dir if dir.ends_with("/") else dir + "/"
+	return ROOT
+
 ## gets the unique filepath to which data will be logged. Uses the filepath variable set in the _ready() function.
 func get_filepath(data_type: String):
-	return str(ROOT + data_type + filepath)
+	return str(get_root() + data_type + filepath)
 
 # -------------------- L O G G I N G ----------------- #
 